@@ -0,0 +1,247 @@
+"""
+    Micro-benchmarks for every public function in lib/tmsignals.py.
+
+    Each case is timed (best of several repeats) and its peak
+    memory is measured with tracemalloc. Results can be saved as a
+    baseline and later runs compared against it; the script exits
+    with status 1 if any case is slower (or uses more memory) than
+    the baseline by more than the allowed threshold, or if a public
+    function has no benchmark case. Slowdowns smaller than an
+    absolute floor (5 us per call by default) are timer noise and
+    are never flagged, however large they are as a fraction, and
+    a case that looks slower is timed again (twice by default)
+    before it is flagged, so a burst of load on the machine does
+    not fail the run.
+
+    USAGE (from the repository folder):
+        python bench/bench_tmsignals.py --save     # record baseline
+        python bench/bench_tmsignals.py            # compare
+        python bench/bench_tmsignals.py -k setRMS  # only matching cases
+
+    Baselines are machine-specific; record one on the booth computer
+    before comparing there.
+
+    Created: Oct. 17, 2026
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+_thisDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(_thisDir, '..', 'lib'))
+import tmsignals as ts
+
+BASELINE = os.path.join(_thisDir, 'baseline.json')
+FS = 48000
+
+# Public functions that have nothing to measure
+SKIP = {'doLocatePeak', 'setDtype'}
+
+
+def _cases():
+    """
+        Return a list of (case name, function name, callable).
+        Inputs are built here, outside of the timed call.
+    """
+    rng = np.random.default_rng(0)
+    sentence = rng.standard_normal(int(2.5*FS)) # ~IEEE sentence
+    wav = (sentence / np.abs(sentence).max() * 32767).astype(np.int16)
+    harms = np.arange(1, 61)
+    amps = 1 / harms
+    phis = np.zeros(len(harms))
+    cases = []
+
+    def add(name, func, call):
+        cases.append((name, func, call))
+
+    # Conversions
+    vals = rng.uniform(-40, 0, 1000)
+    add('db2mag[1000]', 'db2mag', lambda: ts.db2mag(vals))
+    add('mag2db[1000]', 'mag2db', lambda: ts.mag2db(10**(vals/20)))
+    add('deg2rad[1000]', 'deg2rad', lambda: ts.deg2rad(vals))
+    add('rad2deg[1000]', 'rad2deg', lambda: ts.rad2deg(vals))
+    add('phase2time', 'phase2time', lambda: ts.phase2time(500, 90))
+    add('time2phase', 'time2phase', lambda: ts.time2phase(500, 500))
+
+    # Synthesis
+    for dur in (0.5, 2.5):
+        add('addSynth[60 harm,%gs]' % dur, 'addSynth',
+            lambda dur=dur: ts.addSynth(100, harms, amps, phis, dur, FS))
+        add('addSynth[60 harm,off-grid,%gs]' % dur, 'addSynth',
+            lambda dur=dur: ts.addSynth(101.3, harms, amps, phis, dur, FS))
+    add('addSynthBank[16 tones,60 harm,0.5s]', 'addSynthBank',
+        lambda: ts.addSynthBank(np.arange(100, 260, 10), harms, amps,
+            phis, 0.5, FS))
+    add('mkTone[2.5s]', 'mkTone', lambda: ts.mkTone(500, 2.5, 0, FS))
+    for dur in (1, 10):
+        add('mkNoise[20-20k,%gs]' % dur, 'mkNoise',
+            lambda dur=dur: ts.mkNoise(np.arange(20, 20001), dur, FS, 1))
+        add('mkBinauralNoise[500-2k,%gs]' % dur, 'mkBinauralNoise',
+            lambda dur=dur: ts.mkBinauralNoise(np.arange(500, 2001),
+                dur, 300, 2, FS))
+    add('mkITD[0.5s]', 'mkITD', lambda: ts.mkITD(500, 0.5, 300, 2, 0.02, FS))
+    add('mkIPD[0.5s]', 'mkIPD', lambda: ts.mkIPD(500, 0.5, 90, 2, FS))
+    add('mkGaborClick', 'mkGaborClick',
+        lambda: ts.mkGaborClick(4000, 0.002, 300, 2, FS))
+    add('mkGaborClicks[200 clicks]', 'mkGaborClicks',
+        lambda: ts.mkGaborClicks(np.linspace(500, 4000, 200), 0.002,
+            np.linspace(-800, 800, 200), 0, FS))
+    add('mkGaborTrain[500 clicks,10s]', 'mkGaborTrain',
+        lambda: ts.mkGaborTrain(4000, 0.002, 300, 0, np.arange(500)/50, FS))
+    add('mkBinaural[2.5s,33 ITDs]', 'mkBinaural',
+        lambda: ts.mkBinaural(sentence, np.arange(-800, 801, 50), 0, FS))
+
+    # float32 generators (see setDtype): compare time and peak 
+    # memory with the float64 cases above
+    f32 = np.float32
+    add('addSynth[60 harm,off-grid,2.5s,f32]', 'addSynth',
+        lambda: ts.addSynth(101.3, harms, amps, phis, 2.5, FS, dtype=f32))
+    add('addSynthBank[16 tones,60 harm,0.5s,f32]', 'addSynthBank',
+        lambda: ts.addSynthBank(np.arange(100, 260, 10), harms, amps,
+            phis, 0.5, FS, dtype=f32))
+    add('mkTone[2.5s,f32]', 'mkTone',
+        lambda: ts.mkTone(500, 2.5, 0, FS, dtype=f32))
+    add('mkNoise[20-20k,10s,f32]', 'mkNoise',
+        lambda: ts.mkNoise(np.arange(20, 20001), 10, FS, 1, dtype=f32))
+    add('mkBinauralNoise[500-2k,10s,f32]', 'mkBinauralNoise',
+        lambda: ts.mkBinauralNoise(np.arange(500, 2001), 10, 300, 2, FS,
+            dtype=f32))
+    add('mkGaborTrain[500 clicks,10s,f32]', 'mkGaborTrain',
+        lambda: ts.mkGaborTrain(4000, 0.002, 300, 0, np.arange(500)/50, FS,
+            dtype=f32))
+    add('mkBinaural[2.5s,33 ITDs,f32]', 'mkBinaural',
+        lambda: ts.mkBinaural(sentence.astype(f32), np.arange(-800, 801, 50),
+            0, FS))
+    add('mkRamp[uncached]', 'mkRamp',
+        lambda: ts._ramp.__wrapped__(0.02, 'cos', FS, np.float64))
+
+    # Level, gating, trains and analysis
+    for nchans in (1, 2, 8):
+        sig = np.tile(sentence, (nchans, 1)) if nchans > 1 else sentence
+        tag = '[2.5s,%dch]' % nchans
+        add('rms' + tag, 'rms', lambda sig=sig: ts.rms(sig))
+        add('setRMS' + tag, 'setRMS', lambda sig=sig: ts.setRMS(sig, -20))
+        add('doGate' + tag, 'doGate', lambda sig=sig: ts.doGate(sig, 0.02, FS))
+        add('doLoop[x20]' + tag, 'doLoop',
+            lambda sig=sig: ts.doLoop(sig, 20, 0.5, FS))
+        add('iterLoop[x20]' + tag, 'iterLoop',
+            lambda sig=sig: sum(1 for b in ts.iterLoop(sig, 20, 0.5, FS)))
+        if nchans <= 2:
+            add('doFFT' + tag, 'doFFT', lambda sig=sig: ts.doFFT(sig, FS))
+    session = np.tile(sentence, (40, 2, 1))
+    add('setRMS[40 trials,2ch,2.5s]', 'setRMS',
+        lambda: ts.setRMS(session, -20))
+    add('doNormalize[int16,2.5s]', 'doNormalize',
+        lambda: ts.doNormalize(wav, FS))
+    add('specLvl[2.5s]', 'specLvl', lambda: ts.specLvl(sentence, 4000, 100))
+    return cases
+
+
+def _publicFunctions():
+    return sorted(name for name, obj in vars(ts).items()
+        if callable(obj) and not name.startswith('_')
+        and getattr(obj, '__module__', None) == ts.__name__
+        and not inspect.isclass(obj))
+
+
+def measure(call, repeats=5, mintime=0.05):
+    """
+        Return (best seconds per call, peak bytes) for CALL.
+    """
+    # Calibrate the number of calls per repeat
+    start = time.perf_counter()
+    call()
+    once = time.perf_counter() - start
+    number = max(1, int(mintime / max(once, 1e-9)))
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        best = min(best, (time.perf_counter() - start) / number)
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', action='store_true',
+        help='write the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE,
+        help='baseline file (default: bench/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+        help='allowed slowdown as a fraction (default: 0.25)')
+    parser.add_argument('--floor', type=float, default=5.0,
+        help='slowdowns below this many microseconds per call are '
+            'ignored (default: 5)')
+    parser.add_argument('--retries', type=int, default=2,
+        help='times a slower-looking case is timed again (default: 2)')
+    parser.add_argument('--mem-threshold', type=float, default=0.10,
+        help='allowed peak memory growth as a fraction (default: 0.10)')
+    parser.add_argument('-k', dest='pattern', default='',
+        help='only run cases whose name contains this text')
+    args = parser.parse_args(argv)
+
+    cases = _cases()
+    failed = False
+    missing = set(_publicFunctions()) - SKIP - {c[1] for c in cases}
+    if missing and not args.pattern:
+        print('No benchmark case for: ' + ', '.join(sorted(missing)))
+        failed = True
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print('%-40s %12s %12s  %s' % ('case', 'time (ms)', 'peak (MB)', ''))
+    for name, func, call in cases:
+        if args.pattern not in name:
+            continue
+        secs, peak = measure(call)
+        results[name] = {'time': secs, 'peak': peak}
+        note = ''
+        if name in baseline:
+            ref = baseline[name]
+            allowed = max(ref['time'] * args.threshold, args.floor / 1e6)
+            for _ in range(args.retries):
+                if secs - ref['time'] <= allowed:
+                    break
+                secs = min(secs, measure(call)[0])
+                results[name]['time'] = secs
+            if secs - ref['time'] > allowed:
+                note += ' SLOWER x%.2f' % (secs / ref['time'])
+            if peak > ref['peak'] * (1 + args.mem_threshold) + 4096:
+                note += ' MEMORY x%.2f' % (peak / max(ref['peak'], 1))
+            failed = failed or bool(note)
+        print('%-40s %12.3f %12.2f %s' % (name, secs*1000, peak/2**20, note))
+
+    if args.save:
+        if args.pattern and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+            saved.update(results)
+            results = saved
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print('Baseline saved to ' + args.baseline)
+        return 0
+    if not baseline:
+        print('No baseline found; run with --save to record one.')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
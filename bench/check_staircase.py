@@ -0,0 +1,211 @@
+"""
+    Checks that lib/staircase.py still follows the rules of
+    psychopy.data.StairHandler.
+
+    1. Reference sessions (bench/staircase_reference.json) are
+       replayed through staircase.Staircase and a one-element
+       staircase.StaircaseBatch, and every level, reversal and the
+       finished flag must match the reference exactly. The
+       shipped references were worked out by hand from
+       StairHandler's rules, not recorded from StairHandler, so
+       they are not a ground-truth comparison until rerecorded
+       with --record (the file's "source" says which it is).
+    2. Random sessions are run through Staircase and
+       StaircaseBatch side by side (and through StairHandler
+       itself when psychopy is installed), and must match.
+
+    The script exits with status 1 on any difference.
+
+    USAGE (from the repository folder):
+        python bench/check_staircase.py
+        python bench/check_staircase.py --sessions 5000
+        python bench/check_staircase.py --record # needs psychopy
+
+    --record replays the responses of every reference session
+    through psychopy's StairHandler and saves what it did as the
+    new reference.
+
+    Created: Oct. 17, 2026
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+_thisDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(_thisDir, '..', 'lib'))
+import staircase as sc
+
+REFERENCE = os.path.join(_thisDir, 'staircase_reference.json')
+
+# Settings of the random sessions: the scripts' procedure plus
+# rules that exercise multiplicative steps, step size lists,
+# limits and the initial rule
+SETTINGS = [
+    {'startVal': -20.0, 'stepType': 'lin', 'stepSizes': [2.0], 'nUp': 1,
+        'nDown': 1, 'nTrials': 2, 'nReversals': 3,
+        'applyInitialRule': True, 'minVal': -100, 'maxVal': 0},
+    {'startVal': 0.5, 'stepType': 'db', 'stepSizes': [8, 4, 2], 'nUp': 1,
+        'nDown': 3, 'nTrials': 0, 'nReversals': 8,
+        'applyInitialRule': True, 'minVal': 0.01, 'maxVal': 1.0},
+    {'startVal': 0.1, 'stepType': 'log', 'stepSizes': [0.2, 0.1], 'nUp': 2,
+        'nDown': 1, 'nTrials': 10, 'nReversals': 6,
+        'applyInitialRule': False, 'minVal': None, 'maxVal': 0.3},
+    {'startVal': 10.0, 'stepType': 'lin', 'stepSizes': [4, 2, 1], 'nUp': 2,
+        'nDown': 2, 'nTrials': 5, 'nReversals': 5,
+        'applyInitialRule': True, 'minVal': 0, 'maxVal': None},
+]
+
+MAXTRIALS = 200
+
+
+def _history(stair):
+    return {'intensities': [float(x) for x in stair.intensities],
+        'reversalIntensities': [float(x) for x in stair.reversalIntensities],
+        'reversalPoints': [int(x) for x in stair.reversalPoints],
+        'finished': bool(stair.finished)}
+
+
+def _play(stair, responses):
+    """ Feed RESPONSES to a Staircase or StairHandler. """
+    for result in responses:
+        try:
+            next(stair)
+        except StopIteration:
+            break
+        stair.addResponse(result)
+    return _history(stair)
+
+
+def _playBatch(settings, responses):
+    """ Feed RESPONSES to a one-element StaircaseBatch. """
+    batch = sc.StaircaseBatch(1, maxTrials=len(responses), **settings)
+    for result in responses:
+        idx, level = batch.next()
+        if not len(idx):
+            break
+        batch.addResponses([result])
+    nrev = batch.nrev[0]
+    return {'intensities': batch.levels[0, :batch.numTrials()[0]].tolist(),
+        'reversalIntensities': batch.reversals[0, :nrev].tolist(),
+        'finished': bool(batch.finished[0])}
+
+
+def _differences(expected, got):
+    return [key for key in got if got[key] != expected[key]]
+
+
+def _stairHandler(settings):
+    from psychopy import data
+    return data.StairHandler(**settings)
+
+
+def checkReference(path):
+    """ Replay every reference session; return the failures. """
+    with open(path) as f:
+        reference = json.load(f)
+    sessions = reference['sessions']
+    failures = []
+    for ii, session in enumerate(sessions):
+        settings, responses = session['settings'], session['responses']
+        for name, got in [
+                ('Staircase', _play(sc.Staircase(**settings), responses)),
+                ('StaircaseBatch', _playBatch(settings, responses))]:
+            bad = _differences(session['history'], got)
+            if bad:
+                failures.append('reference session %d, %s: %s'
+                    % (ii, name, ', '.join(bad)))
+    print('%d reference sessions replayed (source: %s)'
+        % (len(sessions), reference['source']))
+    return failures
+
+
+def checkRandom(nSessions, seed, withPsychopy):
+    """
+        Run NSESSIONS random sessions per entry of SETTINGS
+        through Staircase and StaircaseBatch (and StairHandler
+        if WITHPSYCHOPY); return the failures.
+    """
+    rng = np.random.default_rng(seed)
+    failures = []
+    for ss, settings in enumerate(SETTINGS):
+        # Responses drawn in advance, so every implementation
+        # sees the same ones; some are neither 1 nor -1
+        responses = rng.choice([1, 1, -1, -1, 0], (nSessions, MAXTRIALS))
+        batch = sc.StaircaseBatch(nSessions, maxTrials=MAXTRIALS, **settings)
+        while True:
+            idx, level = batch.next()
+            if not len(idx):
+                break
+            batch.addResponses(responses[idx, batch.trial])
+        for ii in range(nSessions):
+            single = _play(sc.Staircase(**settings), responses[ii])
+            nrev = batch.nrev[ii]
+            bad = _differences(single, {
+                'intensities': batch.levels[ii,
+                    :batch.numTrials()[ii]].tolist(),
+                'reversalIntensities': batch.reversals[ii, :nrev].tolist(),
+                'finished': bool(batch.finished[ii])})
+            if withPsychopy:
+                bad += ['StairHandler ' + x for x in _differences(single,
+                    _play(_stairHandler(settings), responses[ii]))]
+            if bad:
+                failures.append('settings %d, session %d: %s'
+                    % (ss, ii, ', '.join(bad)))
+    print('%d random sessions x %d settings compared%s' % (nSessions,
+        len(SETTINGS), ' (with StairHandler)' if withPsychopy else ''))
+    return failures
+
+
+def record(path):
+    """ Rerecord the reference sessions in PATH with StairHandler. """
+    with open(path) as f:
+        reference = json.load(f)
+    for session in reference['sessions']:
+        session['history'] = _play(_stairHandler(session['settings']),
+            session['responses'])
+    reference['source'] = 'recorded from psychopy.data.StairHandler'
+    with open(path, 'w') as f:
+        json.dump(reference, f, indent=1)
+    print('Recorded %d sessions in %s' % (len(reference['sessions']), path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=500,
+        help='random sessions per setting (default: 500)')
+    parser.add_argument('--seed', type=int, default=1,
+        help='seed of the random sessions (default: 1)')
+    parser.add_argument('--record', action='store_true',
+        help='rerecord the reference sessions with psychopy StairHandler')
+    args = parser.parse_args(argv)
+
+    try:
+        import psychopy.data # noqa: F401
+        withPsychopy = True
+    except ImportError:
+        withPsychopy = False
+    if args.record:
+        if not withPsychopy:
+            print('--record needs psychopy')
+            return 1
+        record(REFERENCE)
+        return 0
+
+    failures = checkReference(REFERENCE)
+    failures += checkRandom(args.sessions, args.seed, withPsychopy)
+    for failure in failures[:20]:
+        print('MISMATCH ' + failure)
+    if failures:
+        print('%d mismatches' % len(failures))
+        return 1
+    print('All sessions match')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,33 +15,25 @@
 
     Written by: Travis M. Moore
     Created: May 18, 2022
-    Last edited: May 19, 2022
+    Last edited: Oct. 17, 2026
 """
 
-# Import psychopy tools
-import this
-from psychopy import core, visual, gui, data, event, prefs
-from psychopy.tools.filetools import fromFile, toFile
-import psychtoolbox as ptb
-prefs.hardware['audioLib'] = ['PTB']
-from psychopy import sound # Import "sound" AFTER assigning library!!
-
-# Import published modules
-import numpy, random
-import pandas as pd
+# Import only what the parameter dialog needs. Heavier modules 
+# are imported once the dialog is closed; run with 
+# --profile-imports to print the import times (see lib/startup.py).
 import os
 import sys
-from scipy.io import wavfile
-import csv
-
-sys.path.append('.\\lib') # Point to custom library file
-import tmsignals as ts # Custom library
-import importlib 
-importlib.reload(ts) # Reload custom module on every run
 
 # Ensure that relative paths start from the same directory as this script
 _thisDir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(_thisDir)
+sys.path.append(_thisDir + os.sep + 'lib') # Point to custom library files
+import startup
+
+with startup.timed('psychopy (dialog)'):
+    from psychopy import core, gui, prefs
+    from psychopy.tools.filetools import fromFile, toFile
+startup.report('Imports before dialog')
 
 # Check for existing data folder
 if os.path.isdir(_thisDir + os.sep + 'data' + os.sep):
@@ -60,7 +52,7 @@ try:
     expInfo = fromFile('lastParams.pickle')
 except:
     expInfo = {'Subject':'999', 'List Numbers': '1 2', 'Condition':'Quiet', 'Step Size':2.0, 'Noise Level (dB SPL)':70.0, 'Calibration':'n', 'SLM Output':30.0}
-expInfo['dateStr'] = data.getDateStr()
+expInfo['dateStr'] = startup.getDateStr()
 
 dlg = gui.DlgFromDict(expInfo, title='Adaptive SNR50 Task',
                       fixed=['dateStr'])
@@ -69,6 +61,17 @@ if dlg.OK:
 else:
     core.quit()
 
+# Import the rest now that the dialog is closed
+with startup.timed('numpy'):
+    import numpy as np
+with startup.timed('scipy.io.wavfile'):
+    from scipy.io import wavfile
+with startup.timed('tmsignals'):
+    import tmsignals as ts # Custom library
+with startup.timed('psychopy.sound (PTB)'):
+    prefs.hardware['audioLib'] = ['PTB']
+    from psychopy import sound # Import "sound" AFTER assigning library!!
+
 # print(expInfo['List Numbers'])
 # print(type(expInfo['List Numbers']))
 # print(expInfo['List Numbers'])
@@ -90,11 +93,24 @@ if expInfo['Calibration'] == 'y':
     core.wait(probe.secs+0.001)
     core.quit()
 
-
-# make a text file to save data
+# Modules used only by the session (not by calibration)
+with startup.timed('staircase'):
+    import staircase as sc # StairHandler rules without psychopy.data
+with startup.timed('sentindex'):
+    import sentindex # IEEE-DF.csv without pandas
+with startup.timed('ieeecorpus'):
+    import ieeecorpus
+with startup.timed('triallog'):
+    import triallog
+with startup.timed('psychopy.visual/event'):
+    from psychopy import visual, event
+startup.report('Imports after dialog')
+
+
+# make a crash-safe trial log (exported to CSV at the end)
 fileName = _thisDir + os.sep + 'data' + os.sep + '%s_%s_%s' % (expInfo['Subject'], expInfo['Condition'], expInfo['dateStr'])
-dataFile = open(fileName+'.csv', 'w')
-dataFile.write('subject,condition,step_size,num_correct,response,slm_output,slm_cf,raw_level,final_level\n')
+log = triallog.TrialLog(fileName + '.trials', triallog.FIELDS,
+    info=expInfo)
 
 # Assign script-wide variables
 refLevel = -60.0
@@ -104,27 +120,30 @@ SLM_OFFSET = expInfo['SLM Output'] - refLevel
 #data_csv = csv.reader(file_csv)
 #sentences = list(data_csv)
 # Get audio sentences from specified lists
-df = pd.read_csv('.\\sentences\\IEEE-DF.csv')
+# (cached, pre-tokenized index; see lib/sentindex.py)
+sentIndex = sentindex.SentenceIndex.load('.\\sentences\\IEEE-DF.csv')
 lists = expInfo['List Numbers'].split()
 lists = [int(x) for x in lists]
-sentences = df.loc[df['list_num'].isin(lists), 'ieee_text']
+rows = sentIndex.select(lists) # in CSV order
+sentences = [sentIndex.texts[x] for x in rows]
 # Get list of written sentences
-fileList = os.listdir('.\\audio')
-sentence_nums = df.loc[df['list_num'].isin(lists), 'sentence_num']
-fileList = fileList[sentence_nums[0]:sentence_nums[-1]+1]
-
-
-# Create staircase handler
-staircase = data.StairHandler(startVal = refLevel,
-                              stepType = 'lin',
-                              stepSizes=[expInfo['Step Size']],
-                              nup=1,
-                              nDown=1,
-                              nTrials=2,
-                              nReversals=3,
-                              applyInitialRule=True,
-                              minVal=-100,
-                              maxVal=0)
+# (sorted by integer file name; listdir order is arbitrary)
+fileList = ieeecorpus.sortedFiles('.\\audio')
+sentence_nums = sentIndex.sentenceNums[rows]
+fileList = [fileList[x] for x in sentence_nums]
+
+
+# Create staircase handler (same rules as psychopy StairHandler)
+staircase = sc.Staircase(startVal = refLevel,
+                         stepType = 'lin',
+                         stepSizes=[expInfo['Step Size']],
+                         nUp=1,
+                         nDown=1,
+                         nTrials=2,
+                         nReversals=3,
+                         applyInitialRule=True,
+                         minVal=-100,
+                         maxVal=0)
 
 # create window and text objects
 win = visual.Window([800,600], screen=0, monitor='testMonitor', 
@@ -180,13 +199,13 @@ for thisIncrement in staircase:
 
     ###### STIMULUS PRESENTATION ######
     # Show stimulus text
-    theText = ''.join(sentences.iloc[counter])
+    theText = sentences[counter]
     print(theText)
     #text_stim.setText(theText[4:-1])
     #text_stim.setText('Wait...\n\n' + theText)
     #text_stim.setHeight(25)
     #text_stim.draw()
-    words = theText.split()
+    words = sentIndex.words[rows[counter]] # pre-tokenized
     print(words)
     button1.text = words[0]
     button1.draw()
@@ -257,23 +276,26 @@ for thisIncrement in staircase:
 
         # Update staircase handler and write data to file
         staircase.addData(thisResp)
-        dataFile.write('%s,%s,%f,%i,%i,%f,%f,%f,%f\n' %  (expInfo['Subject'], 
+        log.append(expInfo['Subject'], 
             expInfo['Condition'], expInfo['Step Size'], thisKey, thisResp, 
-            expInfo['SLM Output'], SLM_OFFSET, thisIncrement, thisIncrement+SLM_OFFSET))
+            expInfo['SLM Output'], SLM_OFFSET, thisIncrement, thisIncrement+SLM_OFFSET)
         core.wait(1)
 
 # Staircase has ended
-approxThreshold = numpy.average(staircase.reversalIntensities[-2:])
-dataFile.write('SNR50: ' + str((approxThreshold+SLM_OFFSET)-expInfo['Noise Level (dB SPL)']) + ' dB SPL')
-core.wait(0.5)
-dataFile.close()
+approxThreshold = np.average(staircase.reversalIntensities[-2:])
+# The SNR50 goes in its own file (_summary.csv), keeping the 
+# trial CSV one row per trial
+log.close(summary={'speech_level': approxThreshold+SLM_OFFSET,
+    'noise_level': expInfo['Noise Level (dB SPL)'],
+    'snr50': (approxThreshold+SLM_OFFSET)-expInfo['Noise Level (dB SPL)']})
+triallog.exportCSV(fileName + '.trials', fileName + '.csv')
 staircase.saveAsPickle(fileName)
 staircase.saveAsExcel(fileName + '.xlsx', sheetName='trials')
 
 # give feedback in the command line 
 print('reversals:')
 print(staircase.reversalIntensities)
-approxThreshold = numpy.average(staircase.reversalIntensities[-2:])
+approxThreshold = np.average(staircase.reversalIntensities[-2:])
 print('Mean of final 2 reversals = %.3f' % (approxThreshold+SLM_OFFSET))
 print('Mean of 2 reversals = %.3f' % (approxThreshold))
 print('SNR50:' + str(thisIncrement-expInfo['Noise Level (dB SPL)']) + 'dB SPL')
@@ -0,0 +1,279 @@
+"""
+    Persistent, low-latency audio output. One sounddevice output
+    stream is opened at the start of the session and stays open;
+    its callback reads from a preallocated ring buffer, and
+    sounds are mixed into the buffer at the frame on which they
+    should start. No stream is opened or closed between trials,
+    so there is no per-trial setup latency or jitter, and every
+    playback reports the time at which its first sample reaches
+    the DAC.
+
+    A continuous masker (e.g., a noise) can be looped on the same
+    stream at a digitally set level (setMasker). Sounds are then
+    mixed into it with sample accuracy, and each Playback reports
+    the SNR actually presented: the RMS of the sound over the RMS
+    of the masker samples it overlaps. Noise from
+    tmsignals.mkNoise is synthesized with one inverse FFT exactly
+    as long as the noise, so it is periodic and loops without a
+    seam; a recorded masker loops with whatever seam its ends
+    make.
+
+    Times are in seconds on the PortAudio stream clock (see
+    AudioEngine.time).
+
+    EXAMPLE:
+        import audioengine
+        engine = audioengine.AudioEngine(fs=48000, channels=1)
+        playback = engine.play(myTarget, fs) # as soon as possible
+        playback.wait()
+        print(playback.onset)
+        # Masker at -30 dB RMS; sentences are mixed into it
+        engine.setMasker(ts.mkNoise(np.arange(80, 8001), 10, 48000,
+            seed=12), -30)
+        playback = engine.play(myTarget, fs)
+        print(playback.snr)
+        # Time-locked: start exactly 0.5 s after the last onset
+        playback = engine.play(myTarget, fs, when=playback.onset + 0.5)
+        engine.close()
+
+    Created: Oct. 17, 2026
+"""
+
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+
+
+def _dbRMS(sig):
+    """ Level in dB RMS, as tmsignals.mag2db(tmsignals.rms(SIG)). """
+    with np.errstate(divide='ignore'):
+        return 10*np.log10(np.mean(np.square(sig, dtype=np.float64)))
+
+
+class Playback:
+    """
+        Handle for one scheduled sound.
+
+            FRAME: stream frame on which the sound starts
+            NFRAMES: length of the sound in frames
+            ONSET: DAC time of the first sample; None until the
+                callback has rendered it
+            END: DAC time just after the last sample; None until
+                the callback has rendered it
+            SNR: level of the sound re: the masker samples it
+                overlaps, in dB; None without a masker
+    """
+    def __init__(self, engine, frame, nframes, snr=None):
+        self.engine = engine
+        self.frame = frame
+        self.nframes = nframes
+        self.snr = snr
+        self.onset = None
+        self.end = None
+        self._rendered = threading.Event()
+
+    @property
+    def scheduled(self):
+        """ Expected onset time, available as soon as scheduled. """
+        return self.engine.frameTime(self.frame)
+
+    def wait(self, timeout=None):
+        """
+            Block until the last sample has been played, i.e.,
+            until END on the stream clock. Returns False on
+            timeout.
+        """
+        if not self._rendered.wait(timeout):
+            return False
+        remaining = self.end - self.engine.time()
+        if remaining > 0:
+            time.sleep(remaining)
+        return True
+
+
+class AudioEngine:
+    """
+        Persistent output stream fed from a ring buffer.
+
+            FS: sampling rate in Hz
+            CHANNELS: number of output channels
+            DEVICE: sounddevice output device (id or name).
+                Defaults to the system default.
+            BUFFERDUR: ring buffer length in seconds. Sounds are
+                mixed into it, so this bounds how far ahead a
+                sound can be scheduled plus its duration.
+            BLOCKSIZE: frames per callback. 0 lets PortAudio
+                choose the lowest stable size.
+            LATENCY: 'low', 'high' or a latency in seconds
+    """
+    def __init__(self, fs=48000, channels=1, device=None, bufferdur=30,
+            blocksize=0, latency='low'):
+        self.fs = fs
+        self.channels = channels
+        self._ring = np.zeros((int(bufferdur * fs), channels),
+            dtype=np.float32)
+        self._lock = threading.Lock()
+        self._next = 0 # next frame the callback will render
+        self._clock = None # (frame, DAC time) of the last callback
+        self._pending = [] # scheduled Playbacks, in no order
+        self._masker = None # looped (samples, channels) array
+        self._maskerStart = 0 # stream frame of masker sample 0
+        self._maskerGain = np.float32(1)
+        self._maskerdb = None # dB RMS of the masker before gain
+        self.maskerLevel = None # dB RMS of the masker as presented
+        self._started = threading.Event()
+        self.xruns = 0 # callbacks reporting an underflow
+        self.stream = sd.OutputStream(samplerate=fs, channels=channels,
+            device=device, blocksize=blocksize, latency=latency,
+            dtype='float32', callback=self._callback)
+        self.stream.start()
+        # Wait for the first callback, so frame times are known
+        if not self._started.wait(5):
+            self.close()
+            raise RuntimeError('The audio stream did not start')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Stop and close the stream. """
+        self.stream.stop()
+        self.stream.close()
+
+    def time(self):
+        """ Current time on the stream clock. """
+        return self.stream.time
+
+    def frameTime(self, frame):
+        """ DAC time of stream frame FRAME. """
+        frame0, time0 = self._clock
+        return time0 + (frame - frame0) / self.fs
+
+    def _asFrames(self, sig):
+        """ Return SIG as a float32 (samples, channels) array. """
+        sig = np.asarray(sig, dtype=np.float32)
+        if sig.ndim == 1:
+            sig = sig[:, np.newaxis]
+        if sig.shape[1] != self.channels:
+            raise ValueError('SIG has %d channels but the stream has %d'
+                % (sig.shape[1], self.channels))
+        return sig
+
+    @staticmethod
+    def _maskerFrames(masker, start, frame, nframes):
+        """ Samples (before gain) of MASKER, looped from stream
+            frame START, for stream frames FRAME to FRAME +
+            NFRAMES. """
+        jj = frame - start
+        return np.take(masker, np.arange(jj, jj + nframes), axis=0,
+            mode='wrap')
+
+    def setMasker(self, masker, level, fs=None):
+        """
+            Loop MASKER continuously from the next callback on,
+            at LEVEL dB RMS, replacing any current masker.
+
+                MASKER: a 1-channel signal or a (samples,
+                    channels) array
+                LEVEL: masker level in dB RMS (as setRMS)
+                FS: sampling rate of MASKER, checked against the
+                    stream if given
+        """
+        if fs is not None and fs != self.fs:
+            raise ValueError('MASKER is at %d Hz but the stream runs at %d Hz'
+                % (fs, self.fs))
+        masker = self._asFrames(masker)
+        maskerdb = _dbRMS(masker) # outside the lock: a full pass
+        with self._lock:
+            self._masker = masker
+            self._maskerStart = self._next
+            self._maskerdb = maskerdb
+            self._setMaskerGain(level)
+
+    def _setMaskerGain(self, level):
+        self._maskerGain = np.float32(10**((level - self._maskerdb) / 20))
+        self.maskerLevel = level
+
+    def setMaskerLevel(self, level):
+        """ Change the masker level (dB RMS) from the next callback. """
+        with self._lock:
+            self._setMaskerGain(level)
+
+    def stopMasker(self):
+        """ Stop the masker from the next callback. """
+        with self._lock:
+            self._masker = None
+
+    def _callback(self, outdata, frames, timeinfo, status):
+        if status.output_underflow:
+            self.xruns += 1
+        with self._lock:
+            start = self._next
+            self._clock = (start, timeinfo.outputBufferDacTime)
+            ii = start % len(self._ring)
+            first = min(frames, len(self._ring) - ii)
+            outdata[:first] = self._ring[ii:ii + first]
+            outdata[first:] = self._ring[:frames - first]
+            # Clear what was played, so it is silent next time round
+            self._ring[ii:ii + first] = 0
+            self._ring[:frames - first] = 0
+            if self._masker is not None:
+                outdata += self._maskerGain * self._maskerFrames(
+                    self._masker, self._maskerStart, start, frames)
+            self._next = start + frames
+            for playback in [x for x in self._pending
+                    if x.frame + x.nframes <= self._next]:
+                playback.onset = self.frameTime(playback.frame)
+                playback.end = self.frameTime(playback.frame + playback.nframes)
+                self._pending.remove(playback)
+                playback._rendered.set()
+        self._started.set()
+
+    def play(self, sig, fs=None, when=None):
+        """
+            Mix SIG into the output, starting at WHEN (stream
+            time) or as soon as possible if WHEN is None, and
+            return its Playback. Sounds that overlap are summed,
+            with each other and with the masker.
+
+                SIG: a 1-channel signal or a (samples, channels)
+                    array, as read from WAV files
+                FS: sampling rate of SIG, checked against the
+                    stream if given
+                WHEN: onset time on the stream clock
+        """
+        if fs is not None and fs != self.fs:
+            raise ValueError('SIG is at %d Hz but the stream runs at %d Hz'
+                % (fs, self.fs))
+        sig = self._asFrames(sig)
+        nframes = len(sig)
+        with self._lock:
+            frame = self._next
+            if when is not None:
+                frame0, time0 = self._clock
+                frame = frame0 + int(round((when - time0) * self.fs))
+                if frame < self._next:
+                    raise ValueError('WHEN is %.4f s too late'
+                        % ((self._next - frame) / self.fs))
+            if frame + nframes > self._next + len(self._ring):
+                raise ValueError('SIG ends beyond the %.1f s ring buffer'
+                    % (len(self._ring) / self.fs))
+            ii = frame % len(self._ring)
+            first = min(nframes, len(self._ring) - ii)
+            self._ring[ii:ii + first] += sig[:first]
+            self._ring[:nframes - first] += sig[first:]
+            masker = self._masker
+            maskerStart, maskerGain = self._maskerStart, self._maskerGain
+            playback = Playback(self, frame, nframes)
+            self._pending.append(playback)
+        # Measure the SNR outside the lock, so the audio callback
+        # is never held up by it
+        if masker is not None:
+            playback.snr = _dbRMS(sig) - _dbRMS(maskerGain
+                * self._maskerFrames(masker, maskerStart, frame, nframes))
+        return playback
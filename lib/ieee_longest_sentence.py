@@ -1,19 +1,8 @@
-import pandas as pd
-import numpy as np
+import sentindex
 
-df = pd.read_csv('.\\sentences\\IEEE-DF.csv')
-df2 = df['ieee_text']
+# Word counts come from the cached sentence index (no pandas)
+index = sentindex.SentenceIndex.load('.\\sentences\\IEEE-DF.csv')
 
-word_count = []
-
-counter = 0
-for sentence in df2:
-    x = ''.join(df2[counter])
-    words = x.split()
-    #print(words)
-    #print(len(words))
-    word_count.append(len(words))
-    counter += 1
+word_count = index.wordCounts.tolist()
 print(word_count)
 print(max(word_count))
-
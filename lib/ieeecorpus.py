@@ -0,0 +1,229 @@
+"""
+    Precompiled IEEE sentence corpus. A one-off build step packs
+    every IEEE WAV file into a single float32 .npy array (samples
+    end to end, normalized with tmsignals.doNormalize) and writes
+    an index.json that maps each (list_num, sentence_num) of
+    sentences/IEEE-DF.csv to an (offset, length) in that array,
+    along with the level metadata of the sentence (RMS, peak and
+    speech-active RMS after normalization, and the raw minimum
+    and maximum used to normalize it; see stimbank.levelInfo).
+    The SHA-1 hash of IEEE-DF.csv is stored too, so a corpus built
+    from an older version of the CSV file is not used by mistake
+    (see exists).
+
+    Sessions then open the array as a read-only memory map: a
+    sentence lookup is a dictionary access and a slice (no copy),
+    and startup no longer lists the audio folder or opens one
+    file per sentence.
+
+    Build (or rebuild, e.g., after replacing recordings) with:
+        python lib\\ieeecorpus.py
+
+    EXAMPLE:
+        import ieeecorpus
+        corpus = ieeecorpus.IEEECorpus('corpus')
+        sig = corpus.get(1, 0) # list 1, first sentence
+        bank = corpus.bank([1, 2]) # stimbank.StimulusBank
+
+    Created: Oct. 17, 2026
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+from scipy.io import wavfile
+
+import stimbank
+import tmsignals as ts
+
+SAMPLES_FILE = 'samples.npy'
+INDEX_FILE = 'index.json'
+
+
+def sortedFiles(folder):
+    """
+        Return the WAV files in FOLDER sorted by their integer
+        names (1.wav, 2.wav, ..., 720.wav), so that position N
+        holds sentence_num N of IEEE-DF.csv. os.listdir order is
+        arbitrary and must not be used directly.
+    """
+    names = [x for x in os.listdir(folder) if x.lower().endswith('.wav')]
+    return sorted(names, key=lambda x: int(x[:-4]))
+
+
+def readSentences(csvpath):
+    """
+        Return the rows of IEEE-DF.csv as a list of
+        (list_num, sentence_num, ieee_text) tuples, in file
+        order, without pandas.
+    """
+    with open(csvpath, newline='', encoding='utf-8-sig') as f:
+        return [(int(row['list_num']), int(row['sentence_num']),
+            row['ieee_text']) for row in csv.DictReader(f)]
+
+
+def _sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def exists(root, csvpath=None):
+    """
+        True if a corpus has been built in ROOT. If CSVPATH is
+        given, the corpus must also have been built from that
+        exact version of IEEE-DF.csv; corpora built before the
+        hash was stored count as out of date.
+    """
+    indexPath = os.path.join(root, INDEX_FILE)
+    if not (os.path.exists(os.path.join(root, SAMPLES_FILE))
+            and os.path.exists(indexPath)):
+        return False
+    if csvpath is None:
+        return True
+    with open(indexPath) as f:
+        return json.load(f).get('csv_sha1') == _sha1(csvpath)
+
+
+def build(audiodir, csvpath, root='corpus', normalize=True,
+        dtype=np.float32):
+    """
+        Pack every sentence of CSVPATH into ROOT. File N of
+        AUDIODIR (in integer order, see sortedFiles) holds
+        sentence_num N. Files are read twice (once as a memory
+        map for their lengths, once to copy them in), so the
+        whole corpus never has to fit in memory.
+
+            AUDIODIR: folder of IEEE WAV files named 1.wav, ...
+            CSVPATH: path to IEEE-DF.csv
+            ROOT: output folder. It is created if needed.
+            NORMALIZE: apply doNormalize to each file, as the
+                scripts do before setRMS
+            DTYPE: type of the stored samples
+    """
+    rows = readSentences(csvpath)
+    files = sortedFiles(audiodir)
+    paths = [os.path.join(audiodir, files[sent]) for lst, sent, text in rows]
+
+    # First pass: lengths, sampling rate and channel count
+    fs = None
+    shapes = []
+    for path in paths:
+        rate, sig = wavfile.read(path, mmap=True)
+        if fs is None:
+            fs, chans = rate, sig.shape[1:]
+        elif rate != fs or sig.shape[1:] != chans:
+            raise ValueError('%s does not match the sampling rate (%d Hz) '
+                'and channel count of the other files' % (path, fs))
+        shapes.append(sig.shape)
+    lengths = [x[0] for x in shapes]
+    offsets = np.cumsum([0] + lengths)[:-1]
+
+    # Second pass: copy each file into the output memory map
+    os.makedirs(root, exist_ok=True)
+    samplesPath = os.path.join(root, SAMPLES_FILE)
+    tmp = samplesPath[:-4] + '.%d.tmp.npy' % os.getpid()
+    out = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype,
+        shape=(sum(lengths),) + chans)
+    info = []
+    for path, start, length in zip(paths, offsets, lengths):
+        rate, sig = wavfile.read(path)
+        # Normalization constants: doNormalize maps
+        # [raw_min, raw_max] onto [-1, 1]
+        meta = {'raw_min': float(np.min(sig)), 'raw_max': float(np.max(sig))}
+        if normalize:
+            sig = ts.doNormalize(sig, fs)
+        out[start:start + length] = sig
+        # Measure what was stored, in the stored type
+        meta.update(stimbank.levelInfo(out[start:start + length], fs))
+        info.append(meta)
+    out.flush()
+    del out
+    os.replace(tmp, samplesPath)
+
+    index = {'fs': int(fs), 'dtype': np.dtype(dtype).name,
+        'normalize': bool(normalize), 'csv_sha1': _sha1(csvpath),
+        'sentences': [dict({'list_num': lst, 'sentence_num': sent,
+            'file': os.path.basename(path), 'offset': int(start),
+            'length': int(length)}, **meta) for (lst, sent, text), path,
+            start, length, meta in zip(rows, paths, offsets, lengths, info)]}
+    indexPath = os.path.join(root, INDEX_FILE)
+    tmp = indexPath + '.%d.tmp' % os.getpid()
+    with open(tmp, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, indexPath) # atomic
+
+
+class IEEECorpus:
+    """
+        Read-only view of a corpus built with build().
+
+            ROOT: folder holding samples.npy and index.json
+    """
+    def __init__(self, root='corpus'):
+        self.root = root
+        with open(os.path.join(root, INDEX_FILE)) as f:
+            meta = json.load(f)
+        self.fs = meta['fs']
+        self.normalized = meta['normalize']
+        self.samples = np.load(os.path.join(root, SAMPLES_FILE),
+            mmap_mode='r')
+        # (list_num, sentence_num) -> (offset, length), in CSV order
+        self.index = {(x['list_num'], x['sentence_num']):
+            (x['offset'], x['length']) for x in meta['sentences']}
+        # (list_num, sentence_num) -> level metadata (None for
+        # corpora built before it was stored)
+        self.meta = {(x['list_num'], x['sentence_num']):
+            x if 'rms_db' in x else None for x in meta['sentences']}
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self, lists=None):
+        """
+            Return the (list_num, sentence_num) keys of every
+            sentence in LISTS (all lists if None), in the order
+            of IEEE-DF.csv.
+        """
+        if lists is None:
+            return list(self.index)
+        lists = set(lists)
+        return [key for key in self.index if key[0] in lists]
+
+    def info(self, list_num, sentence_num):
+        """
+            Return the stored index entry of one sentence
+            (offset, length, level metadata).
+        """
+        return self.meta[(list_num, sentence_num)]
+
+    def get(self, list_num, sentence_num):
+        """ Return one sentence as a read-only view (no copy). """
+        start, length = self.index[(list_num, sentence_num)]
+        return self.samples[start:start + length]
+
+    def bank(self, lists=None):
+        """
+            Return a stimbank.StimulusBank of the sentences in
+            LISTS (see keys) that indexes straight into the
+            memory map, so nothing is copied until a trial is
+            presented. The stored level metadata is used, so no
+            sentence is read until it is presented.
+        """
+        keys = self.keys(lists)
+        offsets = [self.index[key][0] for key in keys]
+        lengths = [self.index[key][1] for key in keys]
+        info = [self.meta[key] for key in keys]
+        if any(x is None for x in info):
+            info = None # old corpus: measure on load
+        return stimbank.StimulusBank(self.samples, offsets, lengths, self.fs,
+            info)
+
+
+if __name__ == '__main__':
+    # Run from the repository folder
+    build(os.path.join('audio', 'IEEE'),
+        os.path.join('sentences', 'IEEE-DF.csv'), 'corpus')
+    print('Built corpus with %d sentences' % len(IEEECorpus('corpus')))
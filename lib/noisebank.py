@@ -0,0 +1,139 @@
+"""
+    A persistent bank of FROZEN binaural noise tokens. Each token
+    is rendered once with tmsignals.mkBinauralNoise and saved as an
+    .npy file in the bank folder, next to a small .json file that
+    describes it. Later calls (in this or any other process or
+    session) load the token as a read-only memory map, so reusing
+    a token costs a page-in rather than a resynthesis.
+
+    Tokens are keyed by (frequencies, duration, sampling rate,
+    seed, ITD, ILD, type). The file names are derived from the
+    key, and every token has its own description file, so
+    processes rendering tokens at the same time never overwrite
+    each other's entries; index() gathers the descriptions.
+
+    EXAMPLE:
+        import noisebank
+        bank = noisebank.NoiseBank('noise_tokens')
+        sig = bank.get(np.arange(500,2001),0.5,48000,seed=12,itd=300)
+
+    Created: Oct. 17, 2026
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import tmsignals as ts
+
+
+class NoiseBank:
+    """
+        Folder-backed store of frozen noise tokens.
+
+            ROOT: folder holding the tokens (.npy) and their
+                descriptions (.json). It is created if needed.
+    """
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._loaded = {}
+
+    @staticmethod
+    def key(freqs, dur, fs, seed=12, itd=0, ild=0, dtype=None):
+        """
+            Return the canonical key tuple for one token. The
+            frequencies are represented by a hash of their values,
+            and DTYPE defaults to the module-wide type of
+            tmsignals (see tmsignals.setDtype).
+        """
+        freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        digest = hashlib.sha1(freqs.tobytes()).hexdigest()[:16]
+        dtype = np.dtype(ts.DTYPE if dtype is None else dtype).name
+        return (digest, float(dur), int(fs), int(seed), float(itd),
+            float(ild), dtype)
+
+    def _fileName(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return digest[:20] + '.npy'
+
+    def index(self):
+        """
+            Return the description of every token as a {file
+            name: key fields} dict, read from the tokens'
+            description files. Descriptions whose token is not
+            in place are left out.
+        """
+        index = {}
+        names = set(os.listdir(self.root))
+        for name in sorted(names):
+            token = name[:-5] + '.npy'
+            if (name.endswith('.json') and '.tmp' not in name
+                    and token in names):
+                with open(os.path.join(self.root, name)) as f:
+                    index[token] = json.load(f)
+        return index
+
+    def _describe(self, path, key, freqs, shape):
+        digest, dur, fs, seed, itd, ild, dtype = key
+        freqs = np.atleast_1d(freqs)
+        info = {'band': [float(np.min(freqs)), float(np.max(freqs))],
+            'nfreqs': len(freqs), 'freqs_sha1': digest, 'dur': dur,
+            'fs': fs, 'seed': seed, 'itd': itd, 'ild': ild,
+            'dtype': dtype, 'shape': list(shape)}
+        tmp = path[:-4] + '.%d.tmp.json' % os.getpid()
+        with open(tmp, 'w') as f:
+            json.dump(info, f, indent=1)
+        os.replace(tmp, path[:-4] + '.json') # atomic
+
+    def get(self, freqs, dur, fs, seed=12, itd=0, ild=0, dtype=None):
+        """
+            Return the (2, samples) token for the given
+            parameters as a read-only memory map, rendering and
+            storing it first if it is not in the bank yet.
+
+                FREQS: list of frequencies in the noise (see
+                    mkBinauralNoise)
+                DUR: duration in seconds
+                FS: sampling rate in Hz
+                SEED: noise seed (see mkBinauralNoise)
+                ITD: interaural time difference in microseconds
+                ILD: interaural level difference in dB
+                DTYPE: sample type. Defaults to the module-wide
+                    type of tmsignals.
+        """
+        key = self.key(freqs, dur, fs, seed, itd, ild, dtype)
+        if key in self._loaded:
+            return self._loaded[key]
+        path = os.path.join(self.root, self._fileName(key))
+        if not os.path.exists(path):
+            digest, dur, fs, seed, itd, ild, dtype = key
+            token = ts.mkBinauralNoise(freqs, dur, itd, ild, fs, seed,
+                dtype=dtype)
+            # Write to a temporary file, then move into place
+            # unless another process stored the token meanwhile
+            # (replacing a memory-mapped file fails on Windows)
+            tmp = path[:-4] + '.%d.tmp.npy' % os.getpid()
+            np.save(tmp, token)
+            try:
+                if os.path.exists(path):
+                    os.remove(tmp)
+                else:
+                    os.replace(tmp, path)
+            except PermissionError:
+                os.remove(tmp)
+            self._describe(path, key, freqs, token.shape)
+        token = np.load(path, mmap_mode='r')
+        self._loaded[key] = token
+        return token
+
+    def prerender(self, conditions):
+        """
+            Render every token in CONDITIONS (an iterable of
+            dicts of get() arguments) so that later sessions only
+            load them.
+        """
+        for cond in conditions:
+            self.get(**cond)
@@ -0,0 +1,164 @@
+"""
+    Compiled index of the IEEE sentences in sentences/IEEE-DF.csv,
+    usable without pandas. Each sentence is split into words once,
+    its keywords (the words in capitals) are marked, and each
+    list is mapped to the contiguous range of rows it occupies.
+
+    The index is cached next to the CSV file (IEEE-DF.idx.npz)
+    and rebuilt automatically whenever the CSV file changes (its
+    SHA-1 hash is stored in the cache), so loading it at startup
+    takes a few milliseconds and does not import pandas.
+
+    EXAMPLE:
+        import sentindex
+        index = sentindex.SentenceIndex.load('.\\sentences\\IEEE-DF.csv')
+        rows = index.select([1, 2]) # lists 1 and 2, in CSV order
+        theText = index.texts[rows[0]]
+        words = index.words[rows[0]]
+        print(index.keywords[rows[0]], index.wordCounts.max())
+
+    Created: Oct. 17, 2026
+"""
+
+import csv
+import hashlib
+import io
+import os
+import string
+import zipfile
+
+import numpy as np
+
+# Separates words (and sentences) in the cached text buffers
+_SEP = '\0'
+
+
+def _isKeyword(word, position):
+    """
+        True if WORD is a keyword: written in capitals once
+        punctuation is stripped. A capital 'A' (or 'I') that
+        starts the sentence is an ordinary word.
+    """
+    bare = word.strip(string.punctuation)
+    return bare.isupper() and (len(bare) > 1 or position > 0)
+
+
+class SentenceIndex:
+    """
+        Sentences, words and keywords of IEEE-DF.csv.
+
+            LISTNUMS, SENTENCENUMS: list_num and sentence_num of
+                every row (arrays)
+            TEXTS: sentence text of every row, as in the CSV
+            WORDS: tuple of the words of every row
+            KEYWORDS: tuple of the keywords of every row, with
+                punctuation stripped (e.g., PLANKS, not PLANKS.)
+            WORDCOUNTS, KEYWORDCOUNTS, LENGTHS: number of words,
+                keywords and characters of every row (arrays)
+            LISTS: {list_num: slice of rows}
+    """
+    def __init__(self, listNums, sentenceNums, texts, words, isKeyword):
+        self.listNums = np.asarray(listNums)
+        self.sentenceNums = np.asarray(sentenceNums)
+        self.texts = list(texts)
+        self.words = [tuple(x) for x in words]
+        self.keywords = [tuple(w.strip(string.punctuation)
+            for w, k in zip(ws, ks) if k)
+            for ws, ks in zip(self.words, isKeyword)]
+        self._isKeyword = [tuple(x) for x in isKeyword]
+        self.wordCounts = np.array([len(x) for x in self.words])
+        self.keywordCounts = np.array([len(x) for x in self.keywords])
+        self.lengths = np.array([len(x) for x in self.texts])
+        self.lists = {}
+        for ii, num in enumerate(self.listNums.tolist()):
+            rows = self.lists.get(num)
+            if rows is None:
+                self.lists[num] = slice(ii, ii + 1)
+            elif rows.stop == ii:
+                self.lists[num] = slice(rows.start, ii + 1)
+            else:
+                raise ValueError('The sentences of list %d are not '
+                    'together in the CSV file' % num)
+
+    def __len__(self):
+        return len(self.texts)
+
+    @classmethod
+    def fromCSV(cls, csvpath):
+        """ Build the index from IEEE-DF.csv (no cache). """
+        with open(csvpath, 'rb') as f:
+            return cls._fromBytes(f.read())
+
+    @classmethod
+    def _fromBytes(cls, raw):
+        rows = list(csv.DictReader(io.StringIO(raw.decode('utf-8-sig'),
+            newline='')))
+        texts = [row['ieee_text'] for row in rows]
+        words = [x.split() for x in texts]
+        return cls([int(row['list_num']) for row in rows],
+            [int(row['sentence_num']) for row in rows], texts, words,
+            [[_isKeyword(w, ii) for ii, w in enumerate(ws)] for ws in words])
+
+    @classmethod
+    def load(cls, csvpath, cachepath=None):
+        """
+            Load the index of CSVPATH from its cache, or build
+            and cache it if the cache is missing or was built
+            from a different version of the CSV file.
+
+                CSVPATH: path to IEEE-DF.csv
+                CACHEPATH: cache file. Defaults to the CSV path
+                    with .idx.npz in place of .csv.
+        """
+        if cachepath is None:
+            cachepath = os.path.splitext(csvpath)[0] + '.idx.npz'
+        with open(csvpath, 'rb') as f:
+            raw = f.read()
+        sha1 = hashlib.sha1(raw).hexdigest()
+        try:
+            with np.load(cachepath, allow_pickle=False) as cache:
+                if str(cache['sha1']) == sha1:
+                    return cls._fromCache(cache)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            pass # missing or unreadable: rebuild
+        index = cls._fromBytes(raw)
+        try:
+            index._save(cachepath, sha1)
+        except OSError:
+            pass # e.g., read-only folder: use the index uncached
+        return index
+
+    def _save(self, cachepath, sha1):
+        allWords = [w for ws in self.words for w in ws]
+        tmp = cachepath[:-4] + '.%d.tmp.npz' % os.getpid()
+        np.savez(tmp, sha1=np.array(sha1),
+            listNums=self.listNums.astype(np.int16),
+            sentenceNums=self.sentenceNums.astype(np.int16),
+            texts=np.frombuffer(_SEP.join(self.texts).encode('utf-8'),
+                dtype=np.uint8),
+            words=np.frombuffer(_SEP.join(allWords).encode('utf-8'),
+                dtype=np.uint8),
+            wordCounts=self.wordCounts.astype(np.int16),
+            isKeyword=np.array([k for ks in self._isKeyword for k in ks],
+                dtype=bool))
+        os.replace(tmp, cachepath) # atomic
+
+    @classmethod
+    def _fromCache(cls, cache):
+        texts = cache['texts'].tobytes().decode('utf-8').split(_SEP)
+        allWords = cache['words'].tobytes().decode('utf-8').split(_SEP)
+        ends = np.cumsum(cache['wordCounts']).tolist()
+        starts = [0] + ends[:-1]
+        isKeyword = cache['isKeyword'].tolist()
+        return cls(cache['listNums'], cache['sentenceNums'], texts,
+            [allWords[a:b] for a, b in zip(starts, ends)],
+            [isKeyword[a:b] for a, b in zip(starts, ends)])
+
+    def select(self, lists):
+        """
+            Return the rows of every sentence in LISTS, in CSV
+            order (like df['list_num'].isin(LISTS)).
+        """
+        wanted = set(lists)
+        return [ii for num, rows in self.lists.items() if num in wanted
+            for ii in range(rows.start, rows.stop)]
@@ -0,0 +1,350 @@
+"""
+    Lightweight up/down staircases with the same rules as
+    psychopy.data.StairHandler, without importing psychopy.
+
+    Staircase tracks one session and is a drop-in replacement for
+    the StairHandler calls the scripts make (iteration, addData /
+    addResponse, intensities, data, reversalIntensities,
+    reversalPoints, finished, saveAsPickle, saveAsExcel). Its
+    state is a handful of numbers and lists, so a step takes a
+    few microseconds.
+
+    StaircaseBatch advances many independent staircases at once,
+    with its state in NumPy arrays (one element per staircase);
+    see stairsim for Monte Carlo simulation.
+
+    Both follow StairHandler exactly: the initial 1-up/1-down rule
+    until the first reversal (APPLYINITIALRULE), NUP/NDOWN run
+    counters that reset after every level change, a new step size
+    from STEPSIZES after each reversal, MINVAL/MAXVAL limits, and
+    termination once there are NREVERSALS reversals and NTRIALS
+    trials. Any response other than 1 counts as incorrect.
+
+    EXAMPLE:
+        import staircase as sc
+        staircase = sc.Staircase(startVal=-20, stepType='lin',
+            stepSizes=[2], nUp=1, nDown=1, nTrials=2, nReversals=3,
+            applyInitialRule=True, minVal=-100, maxVal=0)
+        for thisIncrement in staircase:
+            ...
+            staircase.addData(thisResp)
+
+    Created: Oct. 17, 2026
+"""
+
+import pickle
+
+import numpy as np
+
+# Staircase directions
+_START, _UP, _DOWN = 0, 1, -1
+
+
+def _stepLevel(level, sign, size, stepType):
+    """
+        Move LEVEL up (SIGN > 0), down (SIGN < 0) or not at all
+        by SIZE, with the same arithmetic as StairHandler, so
+        levels match to the last bit. Scalars or arrays.
+    """
+    if stepType == 'lin':
+        up, down = level + size, level - size
+    elif stepType in ('db', 'log'):
+        factor = 10**(size / 20) if stepType == 'db' else 10**size
+        up, down = level * factor, level / factor
+    else:
+        raise ValueError("STEPTYPE must be 'lin', 'db' or 'log', not %r"
+            % (stepType,))
+    if np.ndim(sign) == 0:
+        return up if sign > 0 else down if sign < 0 else level
+    return np.where(sign > 0, up, np.where(sign < 0, down, level))
+
+
+def _numReversals(nReversals, stepSizes):
+    # At least one reversal per step size, as StairHandler
+    if nReversals is None or nReversals < len(stepSizes):
+        return len(stepSizes)
+    return nReversals
+
+
+class Staircase:
+    """
+        One up/down staircase; arguments as in
+        psychopy.data.StairHandler.
+
+            STARTVAL: level of the first trial
+            NREVERSALS: minimum number of reversals
+            STEPSIZES: step size, or a list with one step size
+                per reversal (the last one is kept)
+            NTRIALS: minimum number of trials
+            NUP, NDOWN: incorrect/correct responses in a row
+                before the level goes up/down
+            APPLYINITIALRULE: use 1-up/1-down until the first
+                reversal
+            STEPTYPE: 'lin' (add), 'db' or 'log' (multiply)
+            MINVAL, MAXVAL: level limits (None for none)
+    """
+    def __init__(self, startVal, nReversals=None, stepSizes=4, nTrials=0,
+            nUp=1, nDown=3, applyInitialRule=True, stepType='db',
+            minVal=None, maxVal=None):
+        _stepLevel(startVal, 0, 1, stepType) # check STEPTYPE
+        self.startVal = startVal
+        self.stepSizes = [float(x) for x in np.atleast_1d(stepSizes)]
+        self.nReversals = _numReversals(nReversals, self.stepSizes)
+        self.nTrials = nTrials
+        self.nUp = nUp
+        self.nDown = nDown
+        self.applyInitialRule = applyInitialRule
+        self.stepType = stepType
+        self.minVal = minVal
+        self.maxVal = maxVal
+
+        self.data = []
+        self.intensities = []
+        self.reversalPoints = []
+        self.reversalIntensities = []
+        self.finished = False
+        self.thisTrialN = -1
+        self.stepSizeCurrent = self.stepSizes[0]
+        self.correctCounter = 0 # + correct / - incorrect run
+        self._direction = _START
+        self._initialRule = False
+        self._nextIntensity = startVal
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.finished:
+            raise StopIteration
+        self.thisTrialN += 1
+        self.intensities.append(self._nextIntensity)
+        return self._nextIntensity
+
+    next = __next__
+
+    def addResponse(self, result):
+        """
+            Record the response to the current trial (1 for
+            correct; anything else is incorrect) and compute the
+            next level.
+        """
+        self.data.append(result)
+        same = len(self.data) > 1 and self.data[-2] == result
+        if result == 1:
+            self.correctCounter = self.correctCounter + 1 if same else 1
+        else:
+            self.correctCounter = self.correctCounter - 1 if same else -1
+        self._calculateNextIntensity()
+
+    addData = addResponse
+
+    def _calculateNextIntensity(self):
+        correct = self.data[-1] == 1
+        # Direction and reversals
+        if not self.reversalIntensities and self.applyInitialRule:
+            goDown, goUp = correct, not correct
+        else:
+            goDown = self.correctCounter >= self.nDown
+            goUp = not goDown and self.correctCounter <= -self.nUp
+        reversal = ((goDown and self._direction == _UP)
+            or (goUp and self._direction == _DOWN))
+        if goDown:
+            self._direction = _DOWN
+        elif goUp:
+            self._direction = _UP
+        if reversal:
+            self.reversalPoints.append(self.thisTrialN)
+            if not self.reversalIntensities and self.applyInitialRule:
+                self._initialRule = True
+            self.reversalIntensities.append(self.intensities[-1])
+        if (len(self.reversalIntensities) >= self.nReversals
+                and len(self.intensities) >= self.nTrials):
+            self.finished = True
+        if reversal and len(self.stepSizes) > 1:
+            nrev = len(self.reversalIntensities)
+            self.stepSizeCurrent = self.stepSizes[min(nrev,
+                len(self.stepSizes) - 1)]
+
+        # Next level
+        if ((not self.reversalIntensities or self._initialRule)
+                and self.applyInitialRule):
+            self._initialRule = False
+            self._move(-1 if correct else 1)
+        elif self.correctCounter >= self.nDown:
+            self._move(-1)
+        elif self.correctCounter <= -self.nUp:
+            self._move(1)
+
+    def _move(self, sign):
+        level = _stepLevel(self._nextIntensity, sign, self.stepSizeCurrent,
+            self.stepType)
+        if sign > 0 and self.maxVal is not None and level > self.maxVal:
+            level = self.maxVal
+        if sign < 0 and self.minVal is not None and level < self.minVal:
+            level = self.minVal
+        self._nextIntensity = level
+        self.correctCounter = 0
+
+    def saveAsPickle(self, fileName):
+        """ Pickle the staircase to FILENAME.psydat. """
+        if not fileName.endswith('.psydat'):
+            fileName += '.psydat'
+        with open(fileName, 'wb') as f:
+            pickle.dump(self, f)
+
+    def saveAsExcel(self, fileName, sheetName='data'):
+        """
+            Save the reversals, levels and responses as rows of
+            one sheet, laid out as StairHandler.saveAsExcel does.
+            Needs pandas and openpyxl.
+        """
+        import pandas as pd
+        if not fileName.endswith('.xlsx'):
+            fileName += '.xlsx'
+        rows = {'Reversal Intensities': self.reversalIntensities,
+            'Reversal Indices': self.reversalPoints,
+            'All Intensities': self.intensities,
+            'All Responses': self.data}
+        pd.DataFrame.from_dict(rows, orient='index').to_excel(fileName,
+            sheet_name=sheetName, header=False)
+
+
+class StaircaseBatch:
+    """
+        N independent staircases advanced together. Arguments as
+        in Staircase; STARTVAL may be a scalar or one value per
+        staircase. All staircases start on the same trial, so
+        trial T of every active staircase is presented together:
+
+            while True:
+                idx, level = batch.next()
+                if not len(idx):
+                    break
+                batch.addResponses(responses for LEVEL)
+
+        History is kept in (N, MAXTRIALS) arrays: LEVELS and
+        REVERSALS (NaN-padded) and RESPONSES (as given; 0 where
+        there was no trial). A staircase that needs more than
+        MAXTRIALS trials stops unfinished.
+    """
+    def __init__(self, n, startVal, nReversals=None, stepSizes=4, nTrials=0,
+            nUp=1, nDown=3, applyInitialRule=True, stepType='db',
+            minVal=None, maxVal=None, maxTrials=100):
+        _stepLevel(startVal, 0, 1, stepType) # check STEPTYPE
+        self.stepSizes = np.atleast_1d(np.asarray(stepSizes, dtype=float))
+        self.nReversals = _numReversals(nReversals, self.stepSizes)
+        self.nTrials = nTrials
+        self.nUp = nUp
+        self.nDown = nDown
+        self.applyInitialRule = applyInitialRule
+        self.stepType = stepType
+        self.minVal = minVal
+        self.maxVal = maxVal
+        self.maxTrials = maxTrials
+
+        shape = (n, maxTrials)
+        self.levels = np.full(shape, np.nan)
+        self.responses = np.zeros(shape, dtype=np.int32)
+        self.reversals = np.full(shape, np.nan)
+        self.nrev = np.zeros(n, dtype=int)
+        self.finished = np.zeros(n, dtype=bool)
+        self.active = np.ones(n, dtype=bool)
+        self.trial = -1
+        self._next = np.full(n, startVal, dtype=float)
+        self._step = np.full(n, self.stepSizes[0])
+        self._counter = np.zeros(n, dtype=int)
+        self._direction = np.full(n, _START, dtype=np.int8)
+        self._initialRule = np.zeros(n, dtype=bool)
+        self._idx = None
+
+    def __len__(self):
+        return len(self.nrev)
+
+    def next(self):
+        """
+            Start the next trial. Returns the indices of the
+            active staircases and their levels (empty once every
+            staircase has finished or MAXTRIALS is reached).
+        """
+        if self.trial + 1 >= self.maxTrials:
+            self.active[:] = False
+        self.trial += 1
+        self._idx = np.flatnonzero(self.active)
+        level = self._next[self._idx]
+        if len(self._idx):
+            self.levels[self._idx, self.trial] = level
+        return self._idx, level
+
+    def addResponses(self, result):
+        """
+            Record the responses (1 for correct; anything else
+            is incorrect) of the staircases returned by the last
+            next(), and compute their next levels.
+        """
+        idx = self._idx
+        result = np.asarray(result)
+        level = self.levels[idx, self.trial]
+        correct = result == 1
+        self.responses[idx, self.trial] = result
+
+        # Run counter
+        if self.trial > 0:
+            same = result == self.responses[idx, self.trial - 1]
+        else:
+            same = np.zeros(len(idx), dtype=bool)
+        counter = np.where(correct, np.where(same, self._counter[idx] + 1, 1),
+            np.where(same, self._counter[idx] - 1, -1))
+
+        # Direction and reversals
+        init = (self.nrev[idx] == 0) & self.applyInitialRule
+        goDown = np.where(init, correct, counter >= self.nDown)
+        goUp = np.where(init, ~correct, ~goDown & (counter <= -self.nUp))
+        direction = self._direction[idx]
+        rev = (goDown & (direction == _UP)) | (goUp & (direction == _DOWN))
+        self._direction[idx] = np.where(goDown, _DOWN,
+            np.where(goUp, _UP, direction))
+        revIdx = idx[rev]
+        self.reversals[revIdx, self.nrev[revIdx]] = level[rev]
+        flag = self._initialRule[idx] | (rev & init)
+        nrev = self.nrev[idx] + rev
+        self.nrev[idx] = nrev
+        done = (nrev >= self.nReversals) & (self.trial + 1 >= self.nTrials)
+        self.finished[idx] = done
+        self.active[idx] = ~done
+        if len(self.stepSizes) > 1:
+            self._step[idx] = np.where(rev, self.stepSizes[np.minimum(nrev,
+                len(self.stepSizes) - 1)], self._step[idx])
+        step = self._step[idx]
+
+        # Next level
+        useInit = ((nrev == 0) | flag) & self.applyInitialRule
+        down = np.where(useInit, correct, counter >= self.nDown)
+        up = np.where(useInit, ~correct, ~down & (counter <= -self.nUp))
+        new = _stepLevel(self._next[idx], np.where(up, 1, np.where(down, -1, 0)),
+            step, self.stepType)
+        if self.maxVal is not None:
+            new = np.where(up, np.minimum(new, self.maxVal), new)
+        if self.minVal is not None:
+            new = np.where(down, np.maximum(new, self.minVal), new)
+        self._next[idx] = new
+        self._counter[idx] = np.where(up | down, 0, counter)
+        self._initialRule[idx] = flag & ~useInit
+
+    def numTrials(self):
+        """ Number of trials presented to each staircase. """
+        return np.sum(~np.isnan(self.levels), axis=1)
+
+    def thresholds(self, nLast=2):
+        """
+            Mean of the last NLAST reversal levels of each
+            staircase (as np.average(reversalIntensities[-NLAST:]));
+            NaN for staircases that did not finish.
+        """
+        cols = self.nrev[:, np.newaxis] - nLast + np.arange(nLast)
+        valid = cols >= 0
+        lastRevs = np.where(valid, np.take_along_axis(self.reversals,
+            np.maximum(cols, 0), axis=1), 0)
+        with np.errstate(invalid='ignore'):
+            threshold = np.sum(lastRevs, axis=1) / np.sum(valid, axis=1)
+        threshold[~self.finished] = np.nan
+        return threshold
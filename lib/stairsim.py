@@ -0,0 +1,210 @@
+"""
+    Headless Monte Carlo simulation of the SNR50 staircase. Many
+    simulated sessions run at once, vectorized in NumPy, against a
+    listener whose probability of passing a sentence follows a
+    logistic psychometric function. The staircases are the ones
+    used in the scripts (staircase.StaircaseBatch, with the rules
+    of psychopy's StairHandler), and the threshold is estimated as
+    the scripts do: the mean of the last reversal levels.
+
+    Use it to compare step sizes, numbers of reversals and
+    estimation rules in seconds before testing anyone: summarize
+    reports the bias and spread of the threshold estimates, the
+    number of trials, and how often a session runs out of
+    sentences.
+
+    USAGE (from the repository folder):
+        python lib/stairsim.py --step 1 2 4 --reversals 3 5 --last 2 4
+
+    EXAMPLE:
+        import stairsim
+        listener = stairsim.Listener(mid=-30, slope=0.10)
+        result = stairsim.simulate(10000, startVal=-20, stepSizes=[2],
+            listener=listener, nReversals=3, maxTrials=20, seed=1)
+        print(stairsim.summarize(result, listener))
+
+    Created: Oct. 17, 2026
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+import staircase as sc
+
+
+class Listener:
+    """
+        Simulated listener. The probability of a correct (pass)
+        response at LEVEL is
+
+            GUESS + (1-GUESS-LAPSE) / (1 + exp(-4*SLOPE*(LEVEL-MID)))
+
+            MID: level of the midpoint of the function, in the
+                units of the staircase (e.g., dB)
+            SLOPE: slope at MID, in proportion correct per dB
+                (for GUESS = LAPSE = 0)
+            GUESS: lower asymptote
+            LAPSE: 1 - upper asymptote
+    """
+    def __init__(self, mid=0.0, slope=0.1, guess=0.0, lapse=0.0):
+        self.mid = mid
+        self.slope = slope
+        self.guess = guess
+        self.lapse = lapse
+
+    def prob(self, level):
+        """ Probability of a correct response at LEVEL. """
+        level = np.asarray(level, dtype=float)
+        return self.guess + (1 - self.guess - self.lapse) / (1
+            + np.exp(-4 * self.slope * (level - self.mid)))
+
+    def threshold(self, p=0.5):
+        """ Level at which the probability correct is P. """
+        g, l = self.guess, self.lapse
+        return self.mid - np.log((1 - g - l) / (p - g) - 1) / (4 * self.slope)
+
+    def respond(self, level, rng):
+        """
+            Draw one response per element of LEVEL: 1 for
+            correct, -1 for incorrect (as in the scripts).
+        """
+        level = np.asarray(level, dtype=float)
+        return np.where(rng.random(level.shape) < self.prob(level), 1, -1)
+
+
+def simulate(nSessions, startVal, stepSizes, listener, nUp=1, nDown=1,
+        nTrials=2, nReversals=3, applyInitialRule=True, minVal=-100,
+        maxVal=0, stepType='lin', nLast=2, maxTrials=20, seed=None):
+    """
+        Run NSESSIONS staircases in parallel and return a dict of
+        arrays (one element or row per session):
+
+            THRESHOLD: mean of the last NLAST reversal levels;
+                NaN for sessions that did not finish
+            FINISHED: True if the staircase finished within
+                MAXTRIALS trials
+            TRIALS: number of trials presented
+            REVERSALS: reversal levels, NaN-padded
+                (sessions, MAXTRIALS)
+            LEVELS: level of every trial, NaN-padded
+                (sessions, MAXTRIALS)
+            RESPONSES: response of every trial (1, -1; 0 after
+                the session ended)
+
+        The staircases are advanced with staircase.StaircaseBatch.
+
+        STARTVAL, STEPSIZES, NUP, NDOWN, NTRIALS, NREVERSALS,
+        APPLYINITIALRULE, MINVAL, MAXVAL and STEPTYPE are as in
+        psychopy.data.StairHandler; the defaults match
+        snr50.py.
+
+            LISTENER: a Listener
+            NLAST: number of final reversals averaged
+            MAXTRIALS: sentences available (e.g., 10 per IEEE
+                list); a session that needs more did not finish
+            SEED: seed for the simulated responses
+    """
+    rng = np.random.default_rng(seed)
+    batch = sc.StaircaseBatch(nSessions, startVal, nReversals, stepSizes,
+        nTrials, nUp, nDown, applyInitialRule, stepType, minVal, maxVal,
+        maxTrials)
+    while True:
+        idx, level = batch.next()
+        if not len(idx):
+            break
+        batch.addResponses(listener.respond(level, rng))
+    return {'threshold': batch.thresholds(nLast),
+        'finished': batch.finished, 'trials': batch.numTrials(),
+        'reversals': batch.reversals, 'levels': batch.levels,
+        'responses': batch.responses}
+
+
+def targetProb(nUp=1, nDown=1):
+    """
+        Probability correct that an NUP-up/NDOWN-down staircase
+        converges on: the one at which a run of NDOWN correct
+        responses (a step down) is as likely to come first as a
+        run of NUP incorrect responses (a step up). For NUP = 1
+        this is 0.5**(1/NDOWN); for NDOWN = 1 it is
+        1 - 0.5**(1/NUP).
+    """
+    def pDown(p):
+        # Chance that NDOWN correct in a row come before NUP
+        # incorrect in a row
+        a, b = p**(nDown - 1), (1 - p)**(nUp - 1)
+        return a * (1 - (1 - p) * b) / (a + b - a * b)
+    lo, hi = 0.0, 1.0
+    for _ in range(60): # pDown increases with p
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if pDown(mid) < 0.5 else (lo, mid)
+    return (lo + hi) / 2
+
+
+def summarize(result, listener, nUp=1, nDown=1):
+    """
+        Summarize a simulate() result against the level that an
+        NUP-up/NDOWN-down staircase converges on for LISTENER
+        (see targetProb). Returns a dict with the BIAS, SD and
+        RMSE of the threshold estimates (finished sessions
+        only), the mean and SD of the number of trials, and the
+        fraction of sessions that FINISHED.
+    """
+    target = listener.threshold(targetProb(nUp, nDown))
+    done = result['finished']
+    err = result['threshold'][done] - target
+    trials = result['trials'][done]
+    nan = float('nan')
+    return {'target': float(target),
+        'bias': float(np.mean(err)) if len(err) else nan,
+        'sd': float(np.std(err)) if len(err) else nan,
+        'rmse': float(np.sqrt(np.mean(err**2))) if len(err) else nan,
+        'trials': float(np.mean(trials)) if len(trials) else nan,
+        'trials_sd': float(np.std(trials)) if len(trials) else nan,
+        'finished': float(np.mean(done))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=10000,
+        help='simulated sessions per procedure (default: 10000)')
+    parser.add_argument('--step', type=float, nargs='+', default=[2.0],
+        help='step sizes in dB to compare (default: 2)')
+    parser.add_argument('--reversals', type=int, nargs='+', default=[3],
+        help='numbers of reversals to compare (default: 3)')
+    parser.add_argument('--last', type=int, nargs='+', default=[2],
+        help='numbers of final reversals averaged (default: 2)')
+    parser.add_argument('--start', type=float, default=-20.0,
+        help='starting level in dB (default: -20)')
+    parser.add_argument('--mid', type=float, default=-30.0,
+        help='listener midpoint in dB (default: -30)')
+    parser.add_argument('--slope', type=float, default=0.10,
+        help='listener slope in proportion/dB (default: 0.10)')
+    parser.add_argument('--lapse', type=float, default=0.0,
+        help='listener lapse rate (default: 0)')
+    parser.add_argument('--max-trials', type=int, default=20,
+        help='sentences available (default: 20, two IEEE lists)')
+    parser.add_argument('--seed', type=int, default=1,
+        help='random seed (default: 1)')
+    args = parser.parse_args(argv)
+
+    listener = Listener(args.mid, args.slope, lapse=args.lapse)
+    print('%6s %5s %5s %8s %7s %7s %7s %9s' % ('step', 'revs', 'last',
+        'bias', 'sd', 'rmse', 'trials', 'finished'))
+    for step in args.step:
+        for nrev in args.reversals:
+            for nlast in args.last:
+                result = simulate(args.sessions, args.start, [step],
+                    listener, nReversals=nrev, nLast=nlast,
+                    maxTrials=args.max_trials, seed=args.seed)
+                s = summarize(result, listener)
+                print('%6.1f %5d %5d %8.2f %7.2f %7.2f %7.1f %8.1f%%' % (
+                    step, nrev, nlast, s['bias'], s['sd'], s['rmse'],
+                    s['trials'], 100 * s['finished']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
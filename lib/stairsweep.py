@@ -0,0 +1,219 @@
+"""
+    Parameter sweeps of the SNR50 procedure over a process pool.
+    Every cell of a grid (e.g., starting level x step size x
+    reversals x listener slope x listener threshold) is simulated
+    with stairsim and summarized. Cells are split into shards that
+    run on separate processes, so a sweep scales with the number
+    of cores.
+
+    Each cell draws its responses from its own seed, derived from
+    the sweep seed and the cell's position in the grid
+    (numpy.random.SeedSequence), so results do not depend on the
+    number of workers, the shard size, or the order in which
+    shards finish. Each finished shard is saved to the output
+    folder straight away; rerunning the same sweep skips them,
+    so an interrupted sweep resumes where it stopped. The shards
+    are then gathered into one columnar table (results.npz, one
+    array per column, plus results.csv).
+
+    USAGE (from the repository folder):
+        python lib/stairsweep.py --out sweep --start -20 -10 ^
+            --step 1 2 4 --reversals 3 5 7 --slope 0.05 0.1 0.2 ^
+            --mid -35 -30 -25 --sessions 5000 --workers 8
+
+    EXAMPLE:
+        import stairsweep
+        cells = stairsweep.grid(startVal=[-20, -10], step=[1, 2, 4],
+            nReversals=[3, 5], slope=[0.1], mid=[-30])
+        table = stairsweep.sweep(cells, 'sweep', nSessions=5000)
+        print(table['step'], table['rmse'])
+
+    Created: Oct. 17, 2026
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+import stairsim
+
+# Parameters of a cell and their defaults (see stairsim.simulate
+# and stairsim.Listener); anything not swept takes its default
+DEFAULTS = {'startVal': -20.0, 'step': 2.0, 'nReversals': 3, 'nTrials': 2,
+    'nLast': 2, 'nUp': 1, 'nDown': 1, 'minVal': -100.0, 'maxVal': 0.0,
+    'maxTrials': 20, 'slope': 0.1, 'mid': -30.0, 'lapse': 0.0}
+
+# Summary columns added to each cell (see stairsim.summarize)
+STATS = ['target', 'bias', 'sd', 'rmse', 'trials', 'trials_sd', 'finished']
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def grid(**axes):
+    """
+        Return every combination of the values in AXES (name:
+        list of values) as a list of cell dicts, in a fixed
+        order. Unknown names raise a ValueError.
+    """
+    unknown = set(axes) - set(DEFAULTS)
+    if unknown:
+        raise ValueError('Unknown sweep parameters: %s'
+            % ', '.join(sorted(unknown)))
+    names = list(axes)
+    return [dict(zip(names, values))
+        for values in itertools.product(*(axes[x] for x in names))]
+
+
+def runCell(cell, nSessions, seed):
+    """
+        Simulate one cell (a dict of DEFAULTS keys) and return
+        the cell parameters with its summary statistics.
+    """
+    p = dict(DEFAULTS, **cell)
+    listener = stairsim.Listener(p['mid'], p['slope'], lapse=p['lapse'])
+    result = stairsim.simulate(nSessions, p['startVal'], [p['step']],
+        listener, nUp=p['nUp'], nDown=p['nDown'], nTrials=p['nTrials'],
+        nReversals=p['nReversals'], minVal=p['minVal'], maxVal=p['maxVal'],
+        nLast=p['nLast'], maxTrials=p['maxTrials'], seed=seed)
+    p.update(stairsim.summarize(result, listener, p['nUp'], p['nDown']))
+    return p
+
+
+def _runShard(cells, first, nSessions, seed):
+    """ Run CELLS (grid positions FIRST, FIRST+1, ...). """
+    return [runCell(cell, nSessions,
+        np.random.SeedSequence(seed, spawn_key=(first + ii,)))
+        for ii, cell in enumerate(cells)]
+
+
+def _columns(rows):
+    """ List of row dicts -> dict of column arrays. """
+    names = list(DEFAULTS) + STATS
+    return {x: np.array([row[x] for row in rows]) for x in names}
+
+
+def _shardPath(out, shard):
+    return os.path.join(out, 'shard_%05d.npz' % shard)
+
+
+def _saveShard(out, shard, rows):
+    path = _shardPath(out, shard)
+    tmp = path[:-4] + '.%d.tmp.npz' % os.getpid()
+    np.savez(tmp, **_columns(rows))
+    os.replace(tmp, path) # atomic: a shard is either complete or absent
+
+
+def _checkManifest(out, manifest):
+    path = os.path.join(out, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            if json.load(f) != manifest:
+                raise ValueError('%s holds a different sweep; use another '
+                    'output folder' % out)
+    else:
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+
+def sweep(cells, out, nSessions=2000, seed=1, workers=None, shardSize=16,
+        verbose=False):
+    """
+        Run every cell in CELLS (see grid) and return the results
+        as a dict of column arrays, one row per cell in the order
+        of CELLS. Shards already saved in OUT are not run again.
+
+            CELLS: list of cell dicts
+            OUT: folder for the shards and results. It is created
+                if needed.
+            NSESSIONS: simulated sessions per cell
+            SEED: sweep seed
+            WORKERS: number of processes (default: all cores)
+            SHARDSIZE: cells per shard (per checkpoint)
+            VERBOSE: print progress
+    """
+    os.makedirs(out, exist_ok=True)
+    _checkManifest(out, {'cells': cells, 'nSessions': nSessions,
+        'seed': seed, 'shardSize': shardSize})
+    starts = range(0, len(cells), shardSize)
+    todo = [(shard, first) for shard, first in enumerate(starts)
+        if not os.path.exists(_shardPath(out, shard))]
+    if todo:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futures = {pool.submit(_runShard, cells[first:first + shardSize],
+                first, nSessions, seed): shard for shard, first in todo}
+            for done, future in enumerate(
+                    concurrent.futures.as_completed(futures), 1):
+                _saveShard(out, futures[future], future.result())
+                if verbose:
+                    print('%d/%d shards' % (done + len(starts) - len(todo),
+                        len(starts)))
+    return gather(out, len(starts))
+
+
+def gather(out, nShards):
+    """
+        Concatenate the NSHARDS saved shards in OUT into one
+        columnar table, save it as results.npz and results.csv,
+        and return it as a dict of column arrays.
+    """
+    parts = []
+    for shard in range(nShards):
+        with np.load(_shardPath(out, shard)) as f:
+            parts.append({x: f[x] for x in f.files})
+    table = {x: np.concatenate([part[x] for part in parts])
+        for x in parts[0]}
+    np.savez(os.path.join(out, 'results.npz'), **table)
+    with open(os.path.join(out, 'results.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(table))
+        writer.writerows(zip(*(table[x].tolist() for x in table)))
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True,
+        help='output folder for shards and results')
+    parser.add_argument('--start', type=float, nargs='+',
+        default=[DEFAULTS['startVal']], help='starting levels in dB')
+    parser.add_argument('--step', type=float, nargs='+',
+        default=[DEFAULTS['step']], help='step sizes in dB')
+    parser.add_argument('--reversals', type=int, nargs='+',
+        default=[DEFAULTS['nReversals']], help='numbers of reversals')
+    parser.add_argument('--last', type=int, nargs='+',
+        default=[DEFAULTS['nLast']], help='numbers of final reversals averaged')
+    parser.add_argument('--slope', type=float, nargs='+',
+        default=[DEFAULTS['slope']], help='listener slopes in proportion/dB')
+    parser.add_argument('--mid', type=float, nargs='+',
+        default=[DEFAULTS['mid']], help='listener midpoints in dB')
+    parser.add_argument('--sessions', type=int, default=2000,
+        help='simulated sessions per cell (default: 2000)')
+    parser.add_argument('--max-trials', type=int,
+        default=DEFAULTS['maxTrials'], help='sentences available (default: 20)')
+    parser.add_argument('--workers', type=int, default=None,
+        help='number of processes (default: all cores)')
+    parser.add_argument('--shard-size', type=int, default=16,
+        help='cells per shard/checkpoint (default: 16)')
+    parser.add_argument('--seed', type=int, default=1,
+        help='sweep seed (default: 1)')
+    args = parser.parse_args(argv)
+
+    cells = grid(startVal=args.start, step=args.step,
+        nReversals=args.reversals, nLast=args.last, slope=args.slope,
+        mid=args.mid, maxTrials=[args.max_trials])
+    print('%d cells, %d sessions each' % (len(cells), args.sessions))
+    sweep(cells, args.out, args.sessions, args.seed, args.workers,
+        args.shard_size, verbose=True)
+    print('Results saved in %s' % os.path.join(args.out, 'results.csv'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+    Helpers for a fast start of the experiment scripts. Heavy
+    modules (psychopy.visual, psychopy.sound, pandas, scipy) are
+    imported only once they are needed, inside TIMED blocks, so
+    the parameter dialog appears as early as possible.
+
+    Run a script with --profile-imports (or set the environment
+    variable SNR50_PROFILE_IMPORTS=1) to print how long each
+    timed import took. For a full per-module breakdown, use
+    python -X importtime snr50.py.
+
+    EXAMPLE:
+        import startup
+        with startup.timed('psychopy.visual'):
+            from psychopy import visual
+        startup.report()
+
+    Created: Oct. 17, 2026
+"""
+
+import contextlib
+import datetime
+import os
+import sys
+import time
+
+PROFILE = ('--profile-imports' in sys.argv
+    or bool(os.environ.get('SNR50_PROFILE_IMPORTS')))
+
+_T0 = time.perf_counter()
+_times = []
+
+
+@contextlib.contextmanager
+def timed(label):
+    """ Record the time spent in the block under LABEL. """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _times.append((label, time.perf_counter() - start))
+
+
+def report(title='Import times'):
+    """
+        Print the timed imports (only when profiling is on) and
+        clear them, so that each stage can be reported
+        separately.
+    """
+    if PROFILE and _times:
+        print('\n%s (%.0f ms since start):' % (title,
+            (time.perf_counter() - _T0) * 1000))
+        for label, secs in _times:
+            print('    %-30s %8.1f ms' % (label, secs * 1000))
+        print('    %-30s %8.1f ms' % ('total',
+            sum(secs for label, secs in _times) * 1000))
+    del _times[:]
+
+
+def getDateStr():
+    """
+        Same format as psychopy.data.getDateStr(), without
+        importing psychopy.data before the dialog.
+    """
+    return datetime.datetime.now().strftime('%Y-%m-%d_%Hh%M.%S.%f')[:-3]
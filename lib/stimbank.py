@@ -0,0 +1,169 @@
+"""
+    In-memory stimulus bank for a whole session. Every sentence
+    is read, normalized (tmsignals.doNormalize) and measured once,
+    before the first trial, and packed into one contiguous array
+    with an offset index. Presenting a trial then only slices the
+    bank and applies one precomputed gain, so no disk access or
+    normalization falls in the inter-trial interval.
+
+    The level metadata of each stimulus (RMS, peak and
+    speech-active RMS; see levelInfo) is computed once, or taken
+    from a precompiled corpus (see ieeecorpus), so whether a
+    stimulus will clip at a given level is known before it is
+    scaled.
+
+    EXAMPLE:
+        import stimbank
+        bank = stimbank.StimulusBank.fromFiles(
+            ['audio\\IEEE\\' + x for x in fileList])
+        if bank.clips(counter, thisIncrement):
+            print('Warning: the stimulus will clip!')
+        myTarget = bank.atLevel(counter, thisIncrement)
+
+    Created: Oct. 17, 2026
+"""
+
+import numpy as np
+from scipy.io import wavfile
+
+import tmsignals as ts
+
+
+def activeRMS(sig, fs, framedur=0.02, floor=-40):
+    """
+        RMS in dB of the speech-active part of SIG: the signal
+        is cut into FRAMEDUR frames, and only frames within
+        FLOOR dB of the loudest frame are included, so pauses
+        and leading/trailing silence do not lower the level.
+
+            SIG: a 1-channel or multichannel signal (samples on
+                axis 0, as read from WAV files)
+            FS: sampling rate in Hz
+            FRAMEDUR: frame duration in seconds
+            FLOOR: activity threshold in dB re: the loudest frame
+    """
+    sig = np.asarray(sig)
+    nframe = max(int(round(framedur * fs)), 1)
+    nframes = max(len(sig) // nframe, 1)
+    frames = sig[:nframes * nframe].reshape((nframes, -1))
+    power = np.mean(np.square(frames, dtype=np.float64), axis=1)
+    if not np.any(power > 0):
+        return -np.inf # silent
+    active = power >= np.max(power) * 10**(floor / 10)
+    return 10*np.log10(np.mean(power[active]))
+
+
+def levelInfo(sig, fs):
+    """
+        Return the level metadata of one stimulus as a dict:
+        RMS_DB (dB RMS, as used by setRMS), PEAK (absolute
+        peak) and ACTIVE_RMS_DB (see activeRMS).
+    """
+    with np.errstate(divide='ignore'):
+        return {'rms_db': float(ts.mag2db(ts.rms(sig))),
+            'peak': float(np.max(np.abs(sig))) if len(sig) else 0.0,
+            'active_rms_db': float(activeRMS(sig, fs))}
+
+
+class StimulusBank:
+    """
+        Contiguous bank of normalized stimuli.
+
+            SAMPLES: all stimuli end to end (samples on axis 0,
+                as read from WAV files). May be a memory map
+                (see ieeecorpus).
+            OFFSETS, LENGTHS: start and length of each stimulus
+                in SAMPLES
+            FS: sampling rate in Hz
+            INFO: list of levelInfo dicts, one per stimulus.
+                Computed from SAMPLES if not given.
+    """
+    def __init__(self, samples, offsets, lengths, fs, info=None):
+        self.samples = samples
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.fs = fs
+        if info is None:
+            info = [levelInfo(self.get(ii), fs) for ii in range(len(self))]
+        # RMS in dB of each stimulus, as used by setRMS
+        self.rmsdb = np.array([x['rms_db'] for x in info], dtype=float)
+        self.peak = np.array([x['peak'] for x in info], dtype=float)
+        self.activedb = np.array([x['active_rms_db'] for x in info],
+            dtype=float)
+
+    @classmethod
+    def fromFiles(cls, paths, normalize=True, dtype=None):
+        """
+            Read, normalize and pack every WAV file in PATHS.
+            All files must share one sampling rate and channel
+            count.
+
+                PATHS: list of WAV file paths, in trial order
+                NORMALIZE: apply doNormalize to each file, as
+                    the scripts do before setRMS
+                DTYPE: type of the bank. Defaults to the
+                    tmsignals module-wide type.
+        """
+        sigs = []
+        fs = None
+        for path in paths:
+            rate, sig = wavfile.read(path)
+            if fs is None:
+                fs = rate
+            elif rate != fs:
+                raise ValueError('%s has a sampling rate of %d Hz, not %d Hz'
+                    % (path, rate, fs))
+            if normalize:
+                sig = ts.doNormalize(sig, fs)
+            sigs.append(sig)
+        lengths = [len(x) for x in sigs]
+        offsets = np.cumsum([0] + lengths)[:-1]
+        dtype = np.dtype(ts.DTYPE if dtype is None else dtype)
+        samples = np.concatenate(sigs).astype(dtype, copy=False) \
+            if sigs else np.zeros(0, dtype=dtype)
+        return cls(samples, offsets, lengths, fs)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def get(self, ii):
+        """ Return stimulus II as a view into the bank (no copy). """
+        start = self.offsets[ii]
+        return self.samples[start:start + self.lengths[ii]]
+
+    def prefetch(self, ii):
+        """
+            Touch every sample of stimulus II, so that a
+            memory-mapped bank (see ieeecorpus) has it in memory
+            before it is presented. Does nothing past the end.
+        """
+        if ii < len(self):
+            np.sum(self.get(ii))
+
+    def gain(self, ii, level):
+        """ Linear gain that sets stimulus II to LEVEL dB RMS. """
+        return 10**((level - self.rmsdb[ii]) / 20)
+
+    def peakAt(self, ii, level):
+        """ Absolute peak of stimulus II once set to LEVEL dB RMS. """
+        return self.peak[ii] * self.gain(ii, level)
+
+    def maxLevel(self, ii):
+        """ Highest level (dB RMS) of stimulus II that does not clip. """
+        return self.rmsdb[ii] - ts.mag2db(self.peak[ii])
+
+    def clips(self, ii, level):
+        """
+            True if stimulus II would exceed +/-1 at LEVEL dB
+            RMS. Uses only the stored metadata.
+        """
+        return self.peakAt(ii, level) > 1
+
+    def atLevel(self, ii, level):
+        """
+            Return a copy of stimulus II at LEVEL dB RMS; same
+            result as ts.setRMS(stimulus, LEVEL) for 1-channel
+            stimuli, with a single multiply.
+        """
+        return np.asarray(self.get(ii)) * self.samples.dtype.type(
+            self.gain(ii, level))
@@ -1,9 +1,81 @@
 #from scipy import interpolate
+import functools
+
 import numpy as np
-from scipy.fft import irfft, rfft, rfftfreq
+from scipy.fft import irfft, next_fast_len, rfft, rfftfreq
+
+# Floating-point type of generated signals (see setDtype)
+DTYPE = np.float64
+
+
+def _binauralSpectra(spec, nfft, itds, ilds, fs):
+    """
+        Apply each ITD (microseconds) as a +/- ITD/2 linear phase 
+        shift and each ILD (dB) as +/- ILD/2 channel gains to the 
+        rfft buffer SPEC of an NFFT-point signal. Returns an 
+        array of shape (conditions, 2, bins). Positive values 
+        lead/favor the right, as elsewhere in this module.
+    """
+    itds, ilds = np.broadcast_arrays(np.atleast_1d(itds), 
+        np.atleast_1d(ilds))
+    halfitd = (fs * itds / 1000000) / 2 # unrounded samples
+    k = np.arange(len(spec))
+    shift = np.exp(-2j*np.pi*np.outer(halfitd, k)/nfft).astype(spec.dtype)
+    gains = 10**(np.array([-ilds, ilds])/40) # (2, conditions)
+    gains = gains.astype(spec.real.dtype)
+    out = np.empty((len(itds), 2, len(spec)), dtype=spec.dtype)
+    out[:, 0] = spec * shift * gains[0][:, None]
+    out[:, 1] = spec * np.conj(shift) * gains[1][:, None]
+    return out
+
+
+def _floatType(sig=None, dtype=None):
+    """
+        Return the floating-point type to produce: DTYPE if 
+        given, else the type of SIG if it is already floating 
+        point, else the module-wide DTYPE.
+    """
+    if dtype is not None:
+        return np.dtype(dtype)
+    if sig is not None and np.issubdtype(np.asarray(sig).dtype, np.floating):
+        return np.asarray(sig).dtype
+    return np.dtype(DTYPE)
 
 
-def addSynth(F0, harm, amp, phi, dur, fs = 48000):
+def _noiseSpectrum(freqs, nsamps, fs, rng, dtype=np.float64):
+    """
+        Return the rfft buffer of an NSAMPS-long noise with one 
+        unit-amplitude component per frequency in FREQS (rounded 
+        to the nearest FFT bin) and random phases drawn from the 
+        Generator RNG, as if the components were summed as 
+        sines. The level thus depends on the number of 
+        frequencies, not on the duration. Frequencies sharing a 
+        bin are summed; those at 0 Hz or at or above the Nyquist 
+        are dropped. The buffer is complex64 for float32 DTYPE.
+    """
+    freqs = np.atleast_1d(np.asarray(freqs, dtype=float))
+    phi = rng.uniform(0, 2*np.pi, len(freqs))
+    idx = np.rint(freqs * nsamps / fs).astype(int)
+    keep = (idx > 0) & (2*idx < nsamps)
+    spec = np.zeros(nsamps//2 + 1, dtype=np.result_type(dtype, np.complex64))
+    np.add.at(spec, idx[keep], (nsamps/2) * np.exp(1j*phi[keep]))
+    return spec
+
+
+def _sin(cycles, phi, dtype):
+    """
+        Return sin(2*pi*CYCLES + PHI) as DTYPE. For float32, 
+        whole cycles are removed in float64 first, so the 
+        phase stays accurate for long signals.
+    """
+    if dtype == np.float64:
+        return np.sin(2*np.pi*cycles + phi)
+    arg = (2*np.pi*np.mod(cycles, 1)).astype(dtype)
+    arg += phi
+    return np.sin(arg, out=arg)
+
+
+def addSynth(F0, harm, amp, phi, dur, fs = 48000, dtype=None):
     """ 
         Create a complex signal via additive synthesis. Returns
         the signal AND the time base. 
@@ -14,26 +86,105 @@ def addSynth(F0, harm, amp, phi, dur, fs = 48000):
         PHI: phase in degrees
         DUR: duration in seconds
         FS: sampling rate in samples/second
+        DTYPE: output type (e.g., np.float32). Defaults to 
+            the module-wide type (see setDtype).
 
         EXAMPLE: Create a sawtooth wave
             harms = np.arange(2,60,2)
             amps = [1/x for x in harms]
             phis = np.zeros(len(harms),dtype=int)
             [t, sig] = addSynth(100,harms,amps,phis,0.05,48000)
+
+        All partials are computed in one batched pass (see 
+        addSynthBank). 
         
         Written by: Travis M. Moore
-        Last edited: Jan. 13, 2022
+        Last edited: Oct. 17, 2026
     """
-    phi = deg2rad(phi) # phase to radians
-    t = np.arange(0,dur,1/fs) # time base
-    sig = np.zeros(len(t)) # Make empty array to save memory
-    # Additive synthesis
-    for ii in range(len(harm)):
-        harmonics = amp[ii] * np.sin(2*np.pi* (F0 * harm[ii]) * t + phi[ii])
-        sig += harmonics
+    dtype = _floatType(dtype=dtype)
+    t = np.arange(0,dur,1/fs).astype(dtype) # time base
+    sig = addSynthBank(F0,harm,amp,phi,dur,fs,dtype)[0]
     return [t, sig]
 
 
+def addSynthBank(F0, harm, amp, phi, dur, fs=48000, dtype=None):
+    """
+        Render one or more complex tones via additive synthesis 
+        in a single batched pass. Returns a 2-D array with one 
+        tone per row (no time base). 
+
+        When every partial falls on an FFT bin of the output 
+        length (i.e., F0*HARM*DUR is a whole number), the tones 
+        are built in the frequency domain with a single inverse 
+        rfft. Otherwise each block of samples is a matrix 
+        product of the partials' complex amplitudes at the start 
+        of the block with one cached block of phasors, which 
+        needs a fixed ~1 MB of temporary memory. 
+
+            F0: fundamental frequency in Hz, or a list of 
+                fundamentals (one per tone)
+            HARM: list of F0 harmonics, shared by all tones, or a 
+                2-D array with one row of harmonics per tone
+            AMP: linear amplitude of each harmonic (1-D or 2-D, 
+                like HARM)
+            PHI: phase of each harmonic in degrees (1-D or 2-D, 
+                like HARM)
+            DUR: duration in seconds
+            FS: sampling rate in samples/second
+            DTYPE: output type (e.g., np.float32). Defaults to 
+                the module-wide type (see setDtype).
+
+        EXAMPLE: Three sawtooth waves at once
+            harms = np.arange(1,60)
+            amps = 1/harms
+            phis = np.zeros(len(harms))
+            sigs = addSynthBank([100,200,400],harms,amps,phis,0.5)
+
+        Created: Oct. 17, 2026
+    """
+    F0 = np.atleast_1d(np.asarray(F0, dtype=float))
+    harm = np.atleast_2d(np.asarray(harm, dtype=float))
+    amp = np.atleast_2d(np.asarray(amp, dtype=float))
+    phi = np.atleast_2d(np.radians(np.asarray(phi, dtype=float)))
+    freqs = F0[:, None] * harm # (tones, partials) in Hz
+    amp = np.broadcast_to(amp, freqs.shape)
+    phi = np.broadcast_to(phi, freqs.shape)
+    nsamps = len(np.arange(0,dur,1/fs)) # match addSynth time base
+    dtype = _floatType(dtype=dtype)
+
+    # Inverse-FFT synthesis when all partials sit on the bin grid
+    bins = freqs * nsamps / fs
+    kk = np.rint(bins).astype(int)
+    if (np.allclose(bins, kk, rtol=0, atol=1e-6) 
+            and kk.min() > 0 and 2*kk.max() < nsamps):
+        # sin(x) = cos(x - pi/2); a cosine of amplitude A on 
+        # bin k has rfft coefficient A*N/2*exp(j*phase)
+        spec = np.zeros((len(F0), nsamps//2+1), 
+            dtype=np.result_type(dtype, np.complex64))
+        coefs = amp * (nsamps/2) * np.exp(1j*(phi - np.pi/2))
+        rows = np.broadcast_to(np.arange(len(F0))[:, None], kk.shape)
+        np.add.at(spec, (rows, kk), coefs)
+        return irfft(spec, n=nsamps, axis=-1)
+
+    # Otherwise rotate phasors: exp(j*w*n) is computed once for a 
+    # short block of samples (about 2**16 values, so it stays in 
+    # cache), and each block of output is that block times the 
+    # complex amplitude of every partial at the block start, 
+    # summed over partials as a matrix product
+    w = 2*np.pi * freqs / fs # (tones, partials) in rad/sample
+    block = max(64, 2**16 // freqs.size)
+    base = np.exp(1j * w[..., None] * np.arange(block))
+    sigs = np.empty((len(F0), nsamps), dtype=dtype)
+    for start in range(0, nsamps, block):
+        n = min(block, nsamps - start)
+        # Whole cycles removed before the phase is formed
+        cycles = np.mod(freqs / fs * start, 1)
+        coefs = amp * np.exp(1j*(2*np.pi*cycles + phi)) # (tones, partials)
+        sigs[:, start:start+n] = np.matmul(coefs[:, None, :],
+            base[..., :n])[:, 0].imag
+    return sigs
+
+
 def db2mag(db):
     """ 
         Convert decibels to magnitude. Takes a single
@@ -73,6 +224,9 @@ def doFFT(sig,fs):
                 2-channel signals are first combined.
             FS: sampling rate in Hz
 
+        For per-channel spectra, Welch PSDs and streaming 
+        analysis of long files, see tmspectra.
+
         Based on tutorial: https://realpython.com/python-scipy-fft/
         Adapted by: Travis M. Moore
         Last edited: Feb. 2, 2022
@@ -90,16 +244,23 @@ def doFFT(sig,fs):
     return xf, np.abs(yf)
 
 
-def doGate(sig,rampdur=0.02,fs=48000):
+def doGate(sig,rampdur=0.02,fs=48000,shape='cos',inplace=False,dtype=None):
     """
         Apply rising and falling ramps to signal SIG, of 
-        duration RAMPDUR. Takes a 1-channel or 2-channel 
-        signal. 
+        duration RAMPDUR. Takes a signal with any number of 
+        channels (samples on the last axis). Only the ramp 
+        samples are touched; no full-length envelope is built. 
 
-            SIG: a 1-channel or 2-channel signal
+            SIG: a 1-channel or multichannel signal
             RAMPDUR: duration of one side of the gate in 
                 seconds
             FS: sampling rate in samples/second
+            SHAPE: 'cos' (raised cosine, default) or 'lin'
+            INPLACE: if True, gate SIG in place (SIG must be a 
+                float array) and return it. Defaults to False.
+            DTYPE: output type when not INPLACE. Defaults to 
+                the type of SIG if it is floating point, else 
+                the module-wide type (see setDtype).
 
             Example: 
             [t, tone] = mkTone(100,0.4,0,48000)
@@ -107,27 +268,17 @@ def doGate(sig,rampdur=0.02,fs=48000):
 
         Original code: Anonymous
         Adapted by: Travis M. Moore
-        Last edited: Jan. 13, 2022          
+        Last edited: Oct. 17, 2026
     """
-    gate =  np.cos(np.linspace(np.pi, 2*np.pi, int(fs*rampdur)))
-    # Adjust envelope modulator to be within +/-1
-    gate = gate + 1 # translate modulator values to the 0/+2 range
-    gate = gate/2 # compress values within 0/+1 range
-    # Create offset gate by flipping the array
-    offsetgate = np.flip(gate)
-    # Check number of channels in signal
-    if len(sig.shape) == 1:
-        # Create "sustain" portion of envelope
-        sustain = np.ones(len(sig)-(2*len(gate)))
-        envelope = np.concatenate([gate, sustain, offsetgate])
-        gated = envelope * sig
-    elif len(sig.shape) == 2:
-        # Create "sustain" portion of envelope
-        sustain = np.ones(len(sig[0])-(2*len(gate)))
-        envelope = np.concatenate([gate, sustain, offsetgate])
-        gatedLeft = envelope * sig[0]
-        gatedRight = envelope * sig[1]
-        gated = np.array([gatedLeft, gatedRight])
+    if inplace:
+        gated = sig
+    else:
+        gated = np.array(sig, dtype=_floatType(sig, dtype))
+    gate = mkRamp(rampdur,shape,fs,gated.dtype)
+    if len(gate) == 0:
+        return gated
+    gated[..., :len(gate)] *= gate
+    gated[..., -len(gate):] *= gate[::-1] # offset gate
     return gated
 
 
@@ -138,33 +289,27 @@ def doLocatePeak():
 def doLoop(sig,numreps,sildur,fs=48000):
     """ Make a train consisting of NUMREPS of repetitions 
         of a given signal SIG separated by silence (i.e.,
-        the ISI) of duration SILDUR. Takes a 1- or 
-        2-channel signal. 
+        the ISI) of duration SILDUR. Takes a signal with any 
+        number of channels (samples on the last axis). The 
+        train is allocated once and filled with one strided 
+        write. To play a long train without building it, see 
+        iterLoop.
 
-            SIG: a 1- or 2-channel signal
+            SIG: a 1-channel or multichannel signal
             NUMREPS: number of time to repeat SIG
             SILDUR: ISI in seconds
 
         Written by Travis M. Moore
-        Last edited: 1/18/2022    
+        Last edited: Oct. 17, 2026    
      """
-    if len(sig.shape) == 1:
-        # Create silence 
-        samps = sildur * fs
-        shh = np.zeros(int(samps))
-        # Create repetitions
-        justone = np.hstack([sig, shh])
-        train = np.hstack((justone,) * numreps)
-        return train
-    elif len(sig.shape) == 2:
-        # Create silence 
-        samps = sildur * fs
-        shh = np.zeros(int(samps))
-        shh = np.array([shh,shh]) # Make two channels
-        # Create repetitions
-        justone = np.hstack([sig, shh])
-        train = np.hstack((justone,) * numreps)
-        return train
+    sig = np.asarray(sig)
+    period = sig.shape[-1] + int(sildur * fs)
+    train = np.zeros(sig.shape[:-1] + (numreps * period,), 
+        dtype=_floatType(sig))
+    # View the train as (..., reps, period) and fill every rep
+    reps = train.reshape(sig.shape[:-1] + (numreps, period))
+    reps[..., :sig.shape[-1]] = sig[..., None, :]
+    return train
 
 
 def doNormalize(sig,fs=48000):
@@ -179,10 +324,16 @@ def doNormalize(sig,fs=48000):
             SIG: a 1-channel array
             FS: the sampling rate
 
+        Integer input is converted to the module-wide float 
+        type first (see setDtype) so the offset cannot 
+        overflow. For signals too long to hold in memory, 
+        see tmstream.streamNormalize.
+
         Written by: Travis M. Moore
         Created: May 23, 2022
-        Last Edited: May 23, 2022
+        Last Edited: Oct. 17, 2026
     """
+    sig = np.asarray(sig, dtype=_floatType(sig))
     sig = sig-np.min(sig)
     denom = np.max(sig) - np.min(sig)
     sig = sig/denom
@@ -191,6 +342,47 @@ def doNormalize(sig,fs=48000):
     return sig
 
 
+def iterLoop(sig,numreps,sildur,fs=48000,blocksize=4800):
+    """
+        Generator version of doLoop. Yields the same train in 
+        blocks of BLOCKSIZE samples (the last block may be 
+        shorter) without ever building the full train, e.g., 
+        to feed an audio callback. Blocks keep the channel 
+        layout of SIG (samples on the last axis); transpose 
+        them for sounddevice.
+
+            SIG: a 1-channel or multichannel signal
+            NUMREPS: number of time to repeat SIG
+            SILDUR: ISI in seconds
+            BLOCKSIZE: samples per block
+
+            EXAMPLE: 
+                click = mkGaborClick(4000,0.002,300,2,48000)
+                for block in iterLoop(click,500,0.1,48000):
+                    stream.write(block.T)
+
+        Created: Oct. 17, 2026
+    """
+    sig = np.asarray(sig)
+    nsig = sig.shape[-1]
+    period = nsig + int(sildur * fs)
+    total = numreps * period
+    block = np.zeros(sig.shape[:-1] + (blocksize,), 
+        dtype=_floatType(sig))
+    for start in range(0, total, blocksize):
+        stop = min(start + blocksize, total)
+        out = block[..., :stop-start]
+        out[...] = 0
+        # Copy in every repetition that overlaps this block
+        for rep in range(start // period, (stop - 1) // period + 1):
+            lo = max(rep * period, start)
+            hi = min(rep * period + nsig, stop)
+            if hi > lo:
+                out[..., lo-start:hi-start] = \
+                    sig[..., lo-rep*period:hi-rep*period]
+        yield out.copy()
+
+
 def mag2db(mag):
     """ 
         Convert magnitude to decibels. Takes a single
@@ -204,97 +396,101 @@ def mag2db(mag):
         return db
 
 
-def mkBinauralNoise(freqs,dur,itd,ild,fs):
-#def mkBinauralNoise(freqs,dur,rampdur,itd,ild,fs):
+def mkBinaural(sig,itds,ilds,fs=48000,circular=False,dtype=None):
+    """
+        Render a 1-channel signal SIG at every ITD/ILD condition 
+        in one pass. The forward FFT is computed once; each ITD 
+        is applied as a linear phase shift (so fractional-sample 
+        delays are exact) and each ILD as a gain. Returns an 
+        array of shape (conditions, 2, samples).
+
+            SIG: a 1-channel signal
+            ITDS: list of ITDs in MICROSECONDS. Negative numbers 
+                lead to the left.
+            ILDS: list of ILDs in dB. Negative numbers favor the 
+                left. ITDS and ILDS are broadcast against each 
+                other; use np.meshgrid to sweep a full grid.
+            FS: sampling rate in Hz
+            CIRCULAR: if False (default), SIG is zero-padded by 
+                half the largest ITD on each side so that the 
+                shifted waveforms do not wrap around. Use True 
+                for periodic signals (e.g., frozen noise) to keep 
+                the original length.
+            DTYPE: output type. Defaults to the type of SIG if 
+                it is floating point, else the module-wide type 
+                (see setDtype).
+
+            EXAMPLE: 
+                [t, tone] = mkTone(500,0.2,0,48000)
+                tone = doGate(tone,0.02,48000)
+                itds = np.arange(-800,801,100)
+                sigs = mkBinaural(tone,itds,0,48000) # (17, 2, N)
+
+        Created: Oct. 17, 2026
+    """
+    sig = np.asarray(sig, dtype=_floatType(sig, dtype))
+    itds, ilds = np.broadcast_arrays(np.atleast_1d(itds), 
+        np.atleast_1d(ilds))
+    nsamps = len(sig)
+    if circular:
+        pad = 0
+        nfft = nsamps
+    else:
+        maxitd = np.max(np.abs(fs * itds / 1000000))
+        pad = int(np.ceil(maxitd/2)) # samples on each side
+        nfft = next_fast_len(nsamps + 2*pad, real=True)
+    spec = rfft(np.pad(sig,(pad,0)), n=nfft) # zero-pads the tail
+    sigs = irfft(_binauralSpectra(spec,nfft,itds,ilds,fs), n=nfft, 
+        axis=-1)
+    return sigs[..., :nsamps + 2*pad]
+
+
+def mkBinauralNoise(freqs,dur,itd,ild,fs,seed=12,dtype=None):
     """ 
         Create FROZEN noise and apply an ITD and/or ILD. Frozen 
         noise will produce the same noise every time the function 
         is called. Update the seed to create new noise. 
 
+        The noise is built in the frequency domain (see mkNoise), 
+        so any duration is allowed without repetition. The ITD 
+        is applied as a linear phase shift of +/- ITD/2 to each 
+        channel, so fractional-sample delays are exact. 
+
             FREQS: list of frequencies to include in noise
             DUR: duration in seconds
-            RAMPDUR: rise/fall gate duration in seconds. If 0, 
-                then no gating is applied.
             ITD: interaural time difference in microseconds.
                 Negative numbers lead to the left. 
             ILD: interaural level difference in dB
                 Negative numbers favor the left. 
             FS: sampling rate in samples per second
+            SEED: seed for the random phases. Defaults to 12. 
+                The noise is built in the frequency domain since 
+                Oct. 17, 2026, so seed 12 no longer gives the 
+                frozen token of earlier versions; data collected 
+                before then did not use this noise.
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
 
             EXAMPLE: 
                 freqs = np.arange(500,2001)
-                sig = ts.mkBinauralNoise(freqs,0.1,0,700,-1,48000)
+                sig = ts.mkBinauralNoise(freqs,0.1,700,-1,48000)
 
         Written by: Travis M. Moore
-        Last edited: Jan. 13, 2022
+        Last edited: Oct. 17, 2026
     """
-    freqs = [x/fs for x in freqs] # Change array into samples
     dur = round(dur * fs) # stim duration in seconds to samples
-    itd = fs * itd / 1000000 # unrounded samples
+    nsamps = int(np.ceil(dur + np.abs(fs * itd / 1000000)))
 
-    # Create time bases
-    fulldur = np.ceil(dur + np.abs(itd))
-    t = np.arange(0,fulldur,dtype=int)
-    tlead = t - np.abs(itd)/2 # time vector for leading signal
-    tlag = t + np.abs(itd)/2 # time vector for lagging signal
-
-    # Set numpy random seed
-    r = np.random.RandomState(12) # only affects local seed; not global
-    phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*r.rand(len(freqs)) # using r seed
-
-    # Additive synthesis
-    if itd > 0:
-        sigLeft = np.zeros(len(tlead))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlead + phi[ii])
-            sigLeft += harmonics   
-        sigRight = np.zeros(len(tlag))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlag + phi[ii])
-            sigRight += harmonics
-    elif itd < 0:
-        sigRight = np.zeros(len(tlead))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlead + phi[ii])
-            sigRight += harmonics   
-        sigLeft = np.zeros(len(tlag))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlag + phi[ii])
-            sigLeft += harmonics
-    elif itd == 0:
-        sigRight = np.zeros(len(t))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * t + phi[ii])
-            sigRight += harmonics   
-        sigLeft = np.zeros(len(t))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * t + phi[ii])
-            sigLeft += harmonics
-
-    # Apply ILD
-    if ild > 0:
-        sigLeft = sigLeft / db2mag(np.abs(ild/2))
-        sigRight = sigRight * db2mag(np.abs(ild/2))
-    elif ild < 0:
-        sigLeft = sigLeft * db2mag(np.abs(ild/2))
-        sigRight = sigRight / db2mag(np.abs(ild/2))
-
-    # Assign noises to left/right channels
-    sigBoth = np.array([sigLeft, sigRight])
-
-    """
-    # Apply gates
-    if rampdur == 0:
-        pass
-    else:
-        # Ensure rampdur is in SECONDS, not samples
-        sigBoth = doGate(sigBoth,rampdur)
-    """
+    # One random-phase spectrum shared by both ears
+    rng = np.random.default_rng(seed)
+    spec = _noiseSpectrum(freqs,nsamps,fs,rng,_floatType(dtype=dtype))
+    specBoth = _binauralSpectra(spec,nsamps,itd,ild,fs)[0]
 
+    sigBoth = irfft(specBoth, n=nsamps, axis=-1)
     return sigBoth
 
 
-def mkGaborClick(cf, dur, itd, ild, fs):
+def mkGaborClick(cf, dur, itd, ild, fs, dtype=None):
     """ 
         MKGABORCLICKS Generate two Gabor clicks with a 
         specified ITD/ILD
@@ -307,11 +503,14 @@ def mkGaborClick(cf, dur, itd, ild, fs):
 
         Example: gclick = mkGaborClick(4000,0.002,300,2,48000);
 
+        For many clicks at once, see mkGaborClicks and 
+        mkGaborTrain.
+
        Author: Chris Stecker
        Adapted by: Travis Moore
        Date of MATLAB adaptation: Apr. 19, 2017
        Date of Python adaptation: Jan. 11, 2022
-       Last Edited: Jan. 11, 2022
+       Last Edited: Oct. 17, 2026
     """
     # Convert user-friendly argument values to samples:
     cf = cf / fs
@@ -319,9 +518,6 @@ def mkGaborClick(cf, dur, itd, ild, fs):
     itd = fs * itd / 1000000
     sd = dur / 6.66; # samples per sd. 6.66 sd total dur (full 16 bits)
 
-    # Is this conversion necessary?
-    #ILD = 20*np.log10(db2mag(abs(ild)))
-
     # Time base
     fulldur = dur + np.abs(itd)
     t = np.arange(1,fulldur+1) - (fulldur/2) # have to add 1 due to arange not include final value
@@ -332,13 +528,6 @@ def mkGaborClick(cf, dur, itd, ild, fs):
     clickleft = np.cos(2*np.pi*cf*tlead) * np.exp(np.square((tlead/sd))*-1)
     clickright = np.cos(2*np.pi*cf*tlag) * np.exp(np.square((tlag/sd))*-1)
 
-    """ See newer version immediately below 
-    # Apply ILD
-    if ild > 0:
-        clickleft = clickleft / ILD
-    if ild < 0:
-        clickright = clickright / ILD
-    """
     # Apply ILD
     if ild > 0:
         clickleft = clickleft / db2mag(np.abs(ild/2))
@@ -348,10 +537,104 @@ def mkGaborClick(cf, dur, itd, ild, fs):
         clickright = clickright / db2mag(np.abs(ild/2))
 
     clickBoth = np.array([clickleft, clickright])
-    return clickBoth
+    return clickBoth.astype(_floatType(dtype=dtype), copy=False)
+
+
+def mkGaborClicks(cfs, durs, itds, ilds, fs=48000, dtype=None):
+    """
+        Generate many stereo Gabor clicks in one vectorized 
+        pass. The arguments are broadcast against each other, 
+        so any of them can be a single value or a list with 
+        one value per click. Returns an array of shape 
+        (clicks, 2, samples); each click starts at sample 0 
+        and is zero-padded to the length of the longest click. 
+        Each row matches mkGaborClick with the same arguments.
+
+            CFS: carrier frequencies in Hz
+            DURS: click lengths in seconds
+            ITDS: delays between clicks in microseconds
+            ILDS: level differences between L/R channels in dB
+            FS: sampling rate in samples/second
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
+
+            EXAMPLE: ITD sweep at 4 kHz
+                itds = np.arange(-600,601,100)
+                clicks = mkGaborClicks(4000,0.002,itds,0,48000)
+
+        Created: Oct. 17, 2026
+    """
+    cfs, durs, itds, ilds = np.broadcast_arrays(*[np.atleast_1d(
+        np.asarray(x, dtype=float)) for x in (cfs, durs, itds, ilds)])
+    # Convert user-friendly argument values to samples
+    cf = (cfs / fs)[:, None]
+    dur = durs * fs
+    itd = (fs * itds / 1000000)[:, None]
+    sd = (dur / 6.66)[:, None] # 6.66 sd total dur (full 16 bits)
+
+    # Shared time base, centred on each click
+    fulldur = dur + np.abs(itd[:, 0])
+    nsamps = np.ceil(fulldur).astype(int) # len(np.arange(1,fulldur+1))
+    n = np.arange(nsamps.max())
+    t = (n + 1) - (fulldur[:, None] / 2)
+    clicks = np.empty((len(cfs), 2, len(n)), dtype=_floatType(dtype=dtype))
+    for chan, tt in enumerate((t - itd/2, t + itd/2)): # left, right
+        clicks[:, chan] = np.cos(2*np.pi*cf*tt) * np.exp(-np.square(tt/sd))
+
+    # Apply ILD (positive values favor the right) and trim
+    gains = 10**(np.array([-ilds, ilds]).T / 40) # (clicks, 2)
+    gains = gains.astype(clicks.dtype)
+    clicks *= gains[..., None]
+    clicks *= (n < nsamps[:, None])[:, None, :]
+    return clicks
+
+
+def mkGaborTrain(cfs, durs, itds, ilds, onsets, fs=48000, totaldur=None,
+        dtype=None):
+    """
+        Place stereo Gabor clicks on a timeline to form a 
+        click train in a single pass. Each click is rendered 
+        by mkGaborClicks and added at its onset (overlapping 
+        clicks are summed). Returns a (2, samples) array.
+
+            CFS, DURS, ITDS, ILDS: as in mkGaborClicks; single 
+                values or one value per click
+            ONSETS: onset time of each click in seconds (not 
+                negative)
+            FS: sampling rate in samples/second
+            TOTALDUR: train duration in seconds. Defaults to 
+                the end of the last click.
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
+
+            EXAMPLE: 20 clicks at 100 Hz rate with an ITD of 300 us
+                train = mkGaborTrain(4000,0.002,300,0,
+                    np.arange(20)/100,48000)
+
+        Created: Oct. 17, 2026
+    """
+    onsets = np.atleast_1d(onsets)
+    if np.any(onsets < 0):
+        raise ValueError('Click onsets must not be negative')
+    cfs, durs, itds, ilds, onsets = np.broadcast_arrays(
+        cfs, durs, itds, ilds, onsets)
+    clicks = mkGaborClicks(cfs, durs, itds, ilds, fs=fs, dtype=dtype)
+    starts = np.round(onsets * fs).astype(int)
+    idx = starts[:, None] + np.arange(clicks.shape[-1]) # (clicks, samples)
+    if totaldur is None:
+        # End of the last click, not of its zero padding
+        lengths = np.ceil(durs * fs + np.abs(fs * itds / 1000000))
+        nsamps = int(np.max(starts + lengths.astype(int)))
+    else:
+        nsamps = round(totaldur * fs)
+    keep = idx < nsamps
+    train = np.zeros((2, nsamps), dtype=clicks.dtype)
+    for chan in range(2):
+        np.add.at(train[chan], idx[keep], clicks[:, chan][keep])
+    return train
 
 
-def mkIPD(freq,dur,ipd,ild,fs=48000):
+def mkIPD(freq,dur,ipd,ild,fs=48000,dtype=None):
     """
         Create a binaural pure tone at frequency FREQ 
         with an interaural phase delay (IPD) and/or interaural 
@@ -362,20 +645,22 @@ def mkIPD(freq,dur,ipd,ild,fs=48000):
             GATEDUR: duration of a single ramp in seconds
             IPD: phase difference in DEGREES
             ILD: level difference in dB
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
 
             EXAMPLE: sig = mkIPD(500,0.1,90,-2,48000)
 
         Written by: Travis M. Moore
-        Last edited: Jan. 19, 2022
+        Last edited: Oct. 17, 2026
     """
     # Apply +/- half of phase to each channel
     phiHalf = np.abs(ipd)/2
     if ipd <= 0:
-        [t, lchan] = mkTone(freq,dur,np.abs(phiHalf),fs) # wants deg
-        [t, rchan] = mkTone(freq,dur,(phiHalf*-1),fs) # wants deg
+        [t, lchan] = mkTone(freq,dur,np.abs(phiHalf),fs,dtype) # wants deg
+        [t, rchan] = mkTone(freq,dur,(phiHalf*-1),fs,dtype) # wants deg
     elif ipd > 0:
-        [t, lchan] = mkTone(freq,dur,(phiHalf*-1),fs) # wants deg
-        [t, rchan] = mkTone(freq,dur,phiHalf,fs) # wants deg
+        [t, lchan] = mkTone(freq,dur,(phiHalf*-1),fs,dtype) # wants deg
+        [t, rchan] = mkTone(freq,dur,phiHalf,fs,dtype) # wants deg
 
     # Apply ILD
     if ild > 0:
@@ -386,16 +671,19 @@ def mkIPD(freq,dur,ipd,ild,fs=48000):
         rchan = rchan / db2mag(np.abs(ild/2))
 
     # Assign channels
-    sig2chan = np.array([lchan, rchan])
+    sig2chan = np.array([lchan, rchan], dtype=_floatType(dtype=dtype))
     return sig2chan
 
 
-def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
+def mkITD(freq,dur,itd,ild,rampdur,fs=48000,dtype=None):
     """
         Create a binaural pure tone at frequency FREQ with 
         an interaural time delay (ITD) and/or interaural 
         level difference (ILD). Implements a whole-waveform
-        shift in time. 
+        shift in time. The output is the same, sample for 
+        sample, as in earlier versions, so stimuli stay 
+        compatible; for a fractional delay of any signal, 
+        see mkBinaural.
 
             FREQ: frequency in Hz
             DUR: duration in seconds
@@ -403,11 +691,13 @@ def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
             ILD: level difference in dB
             RAMPDUR: duration of gating in seconds
             FS: sampling rate in Hz
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
 
             EXAMPLE: sig = mkITD(500,0.05,800,0,0.02,48000)
 
         Written by: Travis M. Moore
-        Last edited: Feb. 8, 2022
+        Last edited: Oct. 17, 2026
     """
     freq = freq / fs # CPS to cycles per sample
     dur = round(dur * fs) # stim duration in seconds to samples
@@ -458,33 +748,80 @@ def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
         rchan = rchan * db2mag(np.abs(ild/2))
 
     sigBoth = np.array([lchan, rchan])
-    return sigBoth
-
-
-def mkNoise(freqs,dur,fs):
-    """ Create a brief noise using additive synthesis and random 
-        phases. WARNING: Durations longer than 1 second will 
-        repeat. Large bandwidths can take a while to process.
+    return sigBoth.astype(_floatType(dtype=dtype), copy=False)
+
+
+def mkNoise(freqs,dur,fs,seed=None,dtype=None):
+    """ Create a noise with a flat spectrum and random phases. 
+        Magnitudes and phases are set directly in an rfft buffer 
+        and inverted once, so any duration is allowed without 
+        repetition and wide bandwidths are fast. Each frequency 
+        in FREQS has unit amplitude (rounded to the nearest FFT 
+        bin), as with additive synthesis, so the level depends 
+        on FREQS and not on DUR; use setRMS to set the level. 
+        The FFT is exactly as long as the noise, so the noise 
+        is periodic and can be looped without a seam.
         
             FREQS: a list of frequencies to be included in the noise
             DUR: duration in seconds
             FS: sampling rate in Hz
+            SEED: seed for the random phases. Pass an integer 
+                for FROZEN noise. Defaults to None (new noise 
+                on every call).
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
 
             EXAMPLE: sig = mkNoise(np.arange(250,3010,10),0.5,48000)
 
         Written by Travis M. Moore
-        Last edited: 1/13/2022
-    """
-    # Create arbitrary amplitudes for addSynth
-    amp = np.ones(len(freqs))
-    # Create random phases
-    phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*np.random.rand(len(freqs))
-    phi = rad2deg(phi) # addSynth function wants degrees
-    [t, myNoise] = addSynth(1,freqs,amp,phi,dur,fs)
+        Last edited: Oct. 17, 2026
+    """
+    nsamps = len(np.arange(0,dur,1/fs))
+    rng = np.random.default_rng(seed)
+    spec = _noiseSpectrum(freqs,nsamps,fs,rng,_floatType(dtype=dtype))
+    myNoise = irfft(spec, n=nsamps)
     return myNoise
 
 
-def mkTone(freq, dur, phi=0, fs=48000):
+def mkRamp(rampdur,shape='cos',fs=48000,dtype=None):
+    """
+        Return one side (the onset) of a gate of duration 
+        RAMPDUR. Ramps are cached by (RAMPDUR, SHAPE, FS, 
+        DTYPE), so repeated gating in a trial loop reuses the 
+        same window; the least recently used ramps are evicted 
+        beyond 64 entries. The returned array is read-only; 
+        flip it for the offset ramp.
+
+            RAMPDUR: duration of the ramp in seconds
+            SHAPE: 'cos' (raised cosine from 0 to 1) or 'lin'
+            FS: sampling rate in samples/second
+            DTYPE: output type. Defaults to the module-wide 
+                type (see setDtype).
+
+            EXAMPLE: ramp = mkRamp(0.02,'cos',48000)
+
+        Created: Oct. 17, 2026
+    """
+    return _ramp(rampdur,shape,fs,_floatType(dtype=dtype))
+
+
+@functools.lru_cache(maxsize=64)
+def _ramp(rampdur,shape,fs,dtype):
+    nsamps = int(fs*rampdur)
+    if shape == 'cos':
+        ramp = np.cos(np.linspace(np.pi, 2*np.pi, nsamps))
+        # Adjust envelope modulator to be within 0/+1
+        ramp = (ramp + 1) / 2
+    elif shape == 'lin':
+        ramp = np.linspace(0, 1, nsamps)
+    else:
+        raise ValueError("SHAPE must be 'cos' or 'lin', not %r" % (shape,))
+    ramp = ramp.astype(dtype)
+    ramp.flags.writeable = False
+    return ramp
+
+
+def mkTone(freq, dur, phi=0, fs=48000, dtype=None):
     """ Create a pure tone. Returns the signal 
         AND the time base. 
     
@@ -492,16 +829,19 @@ def mkTone(freq, dur, phi=0, fs=48000):
         DUR: duration in SECONDS
         PHI: phase in DEGREES
         FS: sampling rate
+        DTYPE: type of the signal and time base. Defaults 
+            to the module-wide type (see setDtype).
 
         EXAMPLE: [t, sig] = (500,0.2,0,48000)
 
     Written by: Travis M. Moore
-    Last edited: 1/12/2022
+    Last edited: 10/17/2026
     """
+    dtype = _floatType(dtype=dtype)
     phi = np.deg2rad(phi) # to radians
     t = np.arange(0,dur,1/fs) # time base
-    sig = np.sin(2*np.pi*freq*t+phi)
-    return [t, sig]
+    sig = _sin(freq*t, phi, dtype)
+    return [t.astype(dtype, copy=False), sig]
 
 
 def phase2time(freq,phase):
@@ -536,32 +876,71 @@ def rad2deg(rad):
 
 def rms(sig):
     """ 
-        Calculate the root mean square of a signal. 
-        
-        NOTE: np.square will return invalid, negative 
-            results if the number excedes the bit 
-            depth. In these cases, convert to int64
-            EXAMPLE: sig = np.array(sig,dtype=int)
+        Calculate the root mean square of a signal. Squares 
+        are accumulated in float64, so integer (e.g., int16 
+        WAV) data do not overflow. For signals too long to 
+        hold in memory, see tmstream.streamRMS.
 
         Written by: Travis M. Moore
-        Last edited: Feb. 3, 2020
+        Last edited: Oct. 17, 2026
     """
-    theRMS = np.sqrt(np.mean(np.square(sig)))
+    theRMS = np.sqrt(np.mean(np.square(sig, dtype=np.float64)))
     return theRMS
 
 
-def setRMS(sig,amp,eq='n'):
+def setDtype(dtype):
+    """
+        Set the module-wide floating-point type used by the 
+        signal generators and for integer input (e.g., 
+        np.float32 to match audio devices and halve memory). 
+        Level calculations (rms, setRMS) always accumulate in 
+        float64. Returns the previous type. Any function that 
+        takes DTYPE overrides this per call.
+
+            DTYPE: np.float32 or np.float64
+
+            EXAMPLE: 
+                ts.setDtype(np.float32)
+                [t, tone] = ts.mkTone(500,10) # float32
+
+        Created: Oct. 17, 2026
+    """
+    global DTYPE
+    if np.dtype(dtype).kind != 'f':
+        raise ValueError('DTYPE must be a floating-point type, not %s' 
+            % np.dtype(dtype))
+    previous = DTYPE
+    DTYPE = np.dtype(dtype).type
+    return previous
+
+
+def setRMS(sig,amp,eq='n',inplace=False):
     """
-        Set RMS level of a 1-channel or 2-channel signal.
+        Set RMS level of a signal with any number of channels 
+        and trials. The last axis holds samples and the one 
+        before it (if any) holds channels, e.g., (samples,), 
+        (channels, samples) or (trials, channels, samples). All 
+        RMS values are computed in one reduction (accumulated 
+        in float64) and the gains are applied by broadcasting.
     
-        SIG: a 1-channel or 2-channel signal
-        AMP: the desired amplitude to be applied to 
-            each channel. Note this will be the RMS 
-            per channel, not the total of both channels.
+        SIG: a signal array, as described above
+        AMP: the desired RMS in dB, applied to each channel. 
+            Note this will be the RMS per channel, not the 
+            total of all channels. Takes a single value or an 
+            array that broadcasts against SIG.shape[:-1] (e.g., 
+            one target per channel or per trial).
         EQ: takes 'y' or 'n'. Whether or not to equalize 
-            the levels in a 2-channel signal. For example, 
+            the levels across channels. For example, 
             a signal with an ILD would lose the ILD with 
-            EQ='y', so the default in 'n'.
+            EQ='y', so the default in 'n'. With EQ='n', each 
+            channel keeps its level relative to the mean 
+            (in dB) of all channels.
+        INPLACE: if True, scale SIG in place (SIG must be a 
+            float array) and return it. Defaults to False.
+
+        Silent channels are returned unchanged. Float input 
+        keeps its type; integer input is returned in the 
+        module-wide type (see setDtype).
 
         EXAMPLE: 
         Create a 2 channel signal
@@ -572,65 +951,29 @@ def setRMS(sig,amp,eq='n'):
 
         Written by: Travis M. Moore
         Created: Jan. 10, 2022
-        Last edited: May 17, 2022
-    """
-    if len(sig.shape) == 1:
-        rmsdb = mag2db(rms(sig))
-        refdb = amp
-        diffdb = np.abs(rmsdb - refdb)
-        if rmsdb > refdb:
-            sigAdj = sig / db2mag(diffdb)
-        elif rmsdb < refdb:
-            sigAdj = sig * db2mag(diffdb)
-        # Edit 5/17/22
-        # Added handling for when rmsdb == refdb
-        elif rmsdb == refdb:
-            sigAdj = sig
-        return sigAdj
-        
-    elif len(sig.shape) == 2:
-        rmsdbLeft = mag2db(rms(sig[0]))
-        rmsdbRight = mag2db(rms(sig[1]))
-
-        ILD = np.abs(rmsdbLeft - rmsdbRight) # get lvl diff
-
-        # Determine lvl advantage
-        if rmsdbLeft > rmsdbRight:
-            lvlAdv = 'left'
-            #print("Adv: %s" % lvlAdv)
-        elif rmsdbRight > rmsdbLeft:
-            lvlAdv = 'right'
-            #print("Adv: %s" % lvlAdv)
-        elif rmsdbLeft == rmsdbRight:
-            lvlAdv = None
-
-        #refdb = amp - 3 # apply half amp to each channel
-        refdb = amp
-        diffdbLeft = np.abs(rmsdbLeft - refdb)
-        diffdbRight = np.abs(rmsdbRight - refdb)
-
-        # Adjust left channel
-        if rmsdbLeft > refdb:
-            sigAdjLeft = sig[0] / db2mag(diffdbLeft)
-        elif rmsdbLeft < refdb:
-            sigAdjLeft = sig[0] * db2mag(diffdbLeft)
-        # Adjust right channel
-        if rmsdbRight > refdb:
-            sigAdjRight = sig[1] / db2mag(diffdbRight)
-        elif rmsdbRight < refdb:
-            sigAdjRight = sig[1] * db2mag(diffdbRight)
-
-        # If there is a lvl difference to maintain across channels
-        if eq == 'n':
-            if lvlAdv == 'left':
-                sigAdjLeft = sigAdjLeft * db2mag(ILD/2)
-                sigAdjRight = sigAdjRight / db2mag(ILD/2)
-            elif lvlAdv == 'right':
-                sigAdjLeft = sigAdjLeft / db2mag(ILD/2)
-                sigAdjRight = sigAdjRight * db2mag(ILD/2)
-
-        sigBothAdj = np.array([sigAdjLeft, sigAdjRight])
-        return sigBothAdj
+        Last edited: Oct. 17, 2026
+    """
+    sig = np.asarray(sig)
+    power = np.mean(np.square(sig, dtype=np.float64), axis=-1)
+    silent = power == 0
+    with np.errstate(divide='ignore'):
+        rmsdb = 10*np.log10(power)
+    refdb = np.broadcast_to(np.asarray(amp, dtype=float), rmsdb.shape)
+
+    # Keep level differences across channels
+    if eq == 'n' and sig.ndim >= 2:
+        audible = np.where(silent, 0, rmsdb)
+        count = np.maximum(np.sum(~silent, axis=-1, keepdims=True), 1)
+        meandb = np.sum(audible, axis=-1, keepdims=True) / count
+        refdb = refdb + np.where(silent, 0, rmsdb - meandb)
+
+    gains = np.where(silent, 1.0, 10**((refdb - rmsdb)/20))
+    gains = gains.astype(_floatType(sig))
+    if inplace:
+        sig *= gains[..., None]
+        return sig
+    sigAdj = sig * gains[..., None]
+    return sigAdj
 
 
 def specLvl(sig, upr, lwr):
@@ -642,12 +985,16 @@ def specLvl(sig, upr, lwr):
             UPR: the upper bandwidth cutoff frequency
             LWR: the lower bandwidth cutoff frequency
 
+        The level per 1-Hz band is the overall level minus 
+        10*log10(bandwidth). For octave/third-octave band 
+        levels, see tmspectra.bandLevels.
+
         Written by: Travis M. Moore
-        Last edited: 2019
+        Last edited: Oct. 17, 2026
     """
     OAL = mag2db(rms(sig))
     BW = upr - lwr
-    SPLnb = OAL - np.log10(BW/1)
+    SPLnb = OAL - 10*np.log10(BW/1)
     return SPLnb
 
 
@@ -0,0 +1,266 @@
+"""
+    Spectral analysis built on scipy.fft: per-channel spectra,
+    Welch power spectral density (PSD), a streaming short-time
+    Fourier transform (STFT) for files too long to hold in memory,
+    and octave/third-octave band levels.
+
+    Unlike tmsignals.doFFT, channels are never summed: every
+    function works along the last axis (samples) and keeps any
+    leading axes (e.g., channels or trials). Segment windows
+    (Welch, STFT) are cached by (name, length), FFT lengths are
+    rounded up to sizes that scipy.fft computes quickly, and every
+    function takes WORKERS to spread the FFTs over several cores
+    (-1 uses all of them).
+
+    EXAMPLE:
+        import tmspectra, tmstream
+        f, psd = tmspectra.welchPSD(sig, 48000, nperseg=4096)
+        # Whole WAV file in constant memory (samples on axis 0)
+        f, psd = tmspectra.streamPSD(
+            tmstream.iterBlocks('calibration\\IEEE_cal.wav'),
+            48000, axis=0)
+        centres, levels = tmspectra.bandLevels(sigs, 48000, 'third')
+
+    Created: Oct. 17, 2026
+"""
+
+import functools
+
+import numpy as np
+from scipy.fft import next_fast_len, rfft, rfftfreq
+from scipy.signal import get_window
+
+
+def bandEdges(bands='third', fmin=25, fmax=20000):
+    """
+        Return the exact (base-10) centre frequencies and the
+        lower and upper edges of every octave or third-octave
+        band whose centre lies between FMIN and FMAX (IEC 61260).
+
+            BANDS: 'octave' or 'third'
+            FMIN, FMAX: range of centre frequencies in Hz
+    """
+    if bands == 'third':
+        step = 1 # tenths of a decade
+    elif bands == 'octave':
+        step = 3
+    else:
+        raise ValueError("BANDS must be 'octave' or 'third', not %r"
+            % (bands,))
+    lo = int(np.ceil(10*np.log10(fmin/1000) / step - 1e-9))
+    hi = int(np.floor(10*np.log10(fmax/1000) / step + 1e-9))
+    centres = 1000 * 10**(step * np.arange(lo, hi+1) / 10)
+    half = 10**(step / 20) # half a band
+    return centres, centres / half, centres * half
+
+
+def _bandSums(power, freqs, lower, upper):
+    """
+        Sum POWER (..., bins) over the bins of FREQS that fall
+        in [LOWER, UPPER) for every band at once.
+    """
+    csum = np.concatenate([np.zeros(power.shape[:-1] + (1,)),
+        np.cumsum(power, axis=-1)], axis=-1)
+    lo = np.searchsorted(freqs, lower)
+    hi = np.searchsorted(freqs, upper)
+    return csum[..., hi] - csum[..., lo]
+
+
+def bandLevels(sig, fs, bands='third', fmin=25, fmax=20000,
+        workers=None):
+    """
+        Level of every octave or third-octave band, for every
+        channel of every signal in SIG, from one shared FFT.
+        SIG may have any leading axes, e.g., (signals, channels,
+        samples). Levels are in dB re: an RMS of 1 (the same
+        reference as mag2db(rms(sig))), so the bands add up to
+        the overall level when they cover the whole spectrum.
+        Bands that contain no FFT bin are -inf. Returns the band
+        centres and an array of shape (..., bands).
+
+            SIG: a 1-channel or multichannel signal, or a batch
+            FS: sampling rate in Hz
+            BANDS: 'octave' or 'third'
+            FMIN, FMAX: range of band centre frequencies in Hz
+            WORKERS: number of cores for scipy.fft
+    """
+    sig = np.asarray(sig)
+    nsamps = sig.shape[-1]
+    spec = rfft(sig, axis=-1, workers=workers)
+    # Mean-square contribution of each bin (Parseval)
+    power = np.abs(spec)**2 * (2 / nsamps**2)
+    power[..., 0] /= 2
+    if nsamps % 2 == 0:
+        power[..., -1] /= 2
+    centres, lower, upper = bandEdges(bands, fmin, min(fmax, fs/2))
+    with np.errstate(divide='ignore'):
+        levels = 10*np.log10(_bandSums(power, rfftfreq(nsamps, 1/fs),
+            lower, upper))
+    return centres, levels
+
+
+@functools.lru_cache(maxsize=32)
+def getWindow(window, nperseg):
+    """
+        Return a cached, read-only analysis window.
+
+            WINDOW: any name accepted by scipy.signal.get_window
+                (e.g., 'hann', 'hamming', 'boxcar')
+            NPERSEG: window length in samples
+    """
+    win = get_window(window, nperseg, fftbins=True)
+    win.flags.writeable = False
+    return win
+
+
+def _psdScale(win, fs, nfft):
+    """ Density scaling and one-sided doubling for |X|**2. """
+    scale = np.full(nfft//2 + 1, 2 / (fs * np.sum(win**2)))
+    scale[0] /= 2
+    if nfft % 2 == 0:
+        scale[-1] /= 2 # Nyquist bin is not doubled
+    return scale
+
+
+def spectra(sig, fs, window='boxcar', nfft=None, workers=None):
+    """
+        Single-sided magnitude spectrum of every channel of SIG
+        (samples on the last axis). Returns the frequencies and
+        an array of shape (..., bins).
+
+            SIG: a 1-channel or multichannel signal
+            FS: sampling rate in Hz
+            WINDOW: window applied before the FFT. Defaults to
+                'boxcar' (none), like doFFT.
+            NFFT: FFT length. Defaults to the signal length.
+            WORKERS: number of cores for scipy.fft
+    """
+    sig = np.asarray(sig)
+    nsamps = sig.shape[-1]
+    nfft = nsamps if nfft is None else nfft
+    if window != 'boxcar':
+        # Whole-signal windows are not cached: at file length
+        # they are large and rarely reused
+        sig = sig * get_window(window, nsamps, fftbins=True)
+    xf = rfftfreq(nfft, 1/fs)
+    yf = np.abs(rfft(sig, n=nfft, axis=-1, workers=workers))
+    return xf, yf
+
+
+def _frames(sig, nperseg, step):
+    """ Strided (no copy) view of SIG as (..., frames, nperseg). """
+    view = np.lib.stride_tricks.sliding_window_view(sig, nperseg, axis=-1)
+    return view[..., ::step, :]
+
+
+def welchPSD(sig, fs, nperseg=4096, noverlap=None, window='hann',
+        nfft=None, workers=None, chunk=256):
+    """
+        Estimate the power spectral density of every channel of
+        SIG with Welch's method (averaged, windowed, overlapping
+        segments; no detrending). Equivalent to
+        scipy.signal.welch(..., detrend=False). Returns the
+        frequencies and an array of shape (..., bins) in
+        units**2/Hz.
+
+            SIG: a 1-channel or multichannel signal
+            FS: sampling rate in Hz
+            NPERSEG: segment length in samples
+            NOVERLAP: overlap in samples. Defaults to NPERSEG/2.
+            WINDOW: window name (see getWindow)
+            NFFT: FFT length. Defaults to NPERSEG rounded up to
+                a fast FFT size.
+            WORKERS: number of cores for scipy.fft
+            CHUNK: number of segments transformed at once, which
+                bounds temporary memory
+    """
+    sig = np.asarray(sig)
+    nperseg = min(nperseg, sig.shape[-1])
+    noverlap = nperseg // 2 if noverlap is None else noverlap
+    nfft = next_fast_len(nperseg, real=True) if nfft is None else nfft
+    win = getWindow(window, nperseg)
+    frames = _frames(sig, nperseg, nperseg - noverlap)
+    nframes = frames.shape[-2]
+    power = np.zeros(sig.shape[:-1] + (nfft//2 + 1,))
+    for start in range(0, nframes, chunk):
+        spec = rfft(frames[..., start:start+chunk, :] * win, n=nfft,
+            axis=-1, workers=workers)
+        power += np.sum(np.abs(spec)**2, axis=-2)
+    psd = power / nframes * _psdScale(win, fs, nfft)
+    return rfftfreq(nfft, 1/fs), psd
+
+
+def stft(blocks, fs, nperseg=4096, noverlap=None, window='hann',
+        nfft=None, workers=None, axis=-1):
+    """
+        Streaming short-time Fourier transform. Consumes an
+        iterable of BLOCKS (any block size, e.g., from
+        tmstream.iterBlocks) and yields (TIMES, FRAMES) as soon
+        as whole segments are available, where TIMES are the
+        segment centres in seconds and FRAMES is a complex array
+        of shape (..., frames, bins). Only one segment of
+        history is kept in memory.
+
+            BLOCKS: iterable of signal blocks
+            FS: sampling rate in Hz
+            NPERSEG, NOVERLAP, WINDOW, NFFT, WORKERS: as in
+                welchPSD
+            AXIS: sample axis of each block. Use 0 for WAV data
+                (samples, channels).
+    """
+    noverlap = nperseg // 2 if noverlap is None else noverlap
+    nfft = next_fast_len(nperseg, real=True) if nfft is None else nfft
+    step = nperseg - noverlap
+    win = getWindow(window, nperseg)
+    carry = None
+    consumed = 0 # samples dropped from the front of CARRY so far
+    for block in blocks:
+        block = np.moveaxis(np.asarray(block), axis, -1)
+        carry = block if carry is None else np.concatenate(
+            [carry, block], axis=-1)
+        nframes = (carry.shape[-1] - nperseg) // step + 1
+        if nframes < 1:
+            continue
+        frames = _frames(carry, nperseg, step)[..., :nframes, :]
+        spec = rfft(frames * win, n=nfft, axis=-1, workers=workers)
+        starts = consumed + step * np.arange(nframes)
+        yield (starts + nperseg/2) / fs, spec
+        carry = carry[..., nframes*step:]
+        consumed += nframes * step
+
+
+def streamPSD(blocks, fs, nperseg=4096, noverlap=None, window='hann',
+        nfft=None, workers=None, axis=-1):
+    """
+        Welch PSD of a signal delivered as an iterable of
+        BLOCKS, computed in constant memory from stft. Matches
+        welchPSD on the whole signal. Returns the frequencies
+        and an array of shape (..., bins).
+    """
+    nfft = next_fast_len(nperseg, real=True) if nfft is None else nfft
+    power = 0
+    nframes = 0
+    for times, spec in stft(blocks, fs, nperseg, noverlap, window, nfft,
+            workers, axis):
+        power = power + np.sum(np.abs(spec)**2, axis=-2)
+        nframes += len(times)
+    psd = power / nframes * _psdScale(getWindow(window, nperseg), fs, nfft)
+    return rfftfreq(nfft, 1/fs), psd
+
+
+def streamBandLevels(blocks, fs, bands='third', fmin=25, fmax=20000,
+        nperseg=8192, window='hann', workers=None, axis=-1):
+    """
+        Band levels (as in bandLevels) of a signal delivered as
+        an iterable of BLOCKS, from a Welch PSD computed in
+        constant memory (see streamPSD). Use a long NPERSEG for
+        low-frequency bands. Returns the band centres and an
+        array of shape (..., bands).
+    """
+    freqs, psd = streamPSD(blocks, fs, nperseg, window=window,
+        workers=workers, axis=axis)
+    centres, lower, upper = bandEdges(bands, fmin, min(fmax, fs/2))
+    power = psd * (freqs[1] - freqs[0]) # density to power per bin
+    with np.errstate(divide='ignore'):
+        levels = 10*np.log10(_bandSums(power, freqs, lower, upper))
+    return centres, levels
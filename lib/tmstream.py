@@ -0,0 +1,115 @@
+"""
+    Streaming (block-by-block) versions of the level statistics
+    in tmsignals. Use these to measure long recordings, such as
+    calibration files and masker recordings, in constant memory.
+    All accumulation is done in float64, so integer WAV data
+    cannot overflow. Results match rms, doNormalize and specLvl
+    on the whole signal to within floating-point rounding.
+
+    Blocks may come from any iterable of arrays (e.g., a
+    generator) or from iterBlocks, which slices a WAV file
+    (memory-mapped), a memmap or an in-memory array.
+
+    EXAMPLE:
+        import tmstream
+        stats = tmstream.RunningStats()
+        for block in tmstream.iterBlocks('calibration\\IEEE_cal.wav'):
+            stats.update(block)
+        print(stats.rms, stats.peak)
+
+    Created: Oct. 17, 2026
+"""
+
+import numpy as np
+from scipy.io import wavfile
+
+import tmsignals as ts
+
+
+class RunningStats:
+    """
+        Running sum-of-squares, minimum, maximum and peak
+        across every value of every block passed to UPDATE.
+    """
+    def __init__(self):
+        self.count = 0
+        self.sumsq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, block):
+        """ Add one block (any shape) to the running totals. """
+        block = np.asarray(block)
+        if block.size == 0:
+            return self
+        self.count += block.size
+        self.sumsq += np.sum(np.square(block, dtype=np.float64))
+        self.min = min(self.min, float(np.min(block)))
+        self.max = max(self.max, float(np.max(block)))
+        return self
+
+    @property
+    def rms(self):
+        """ Root mean square of all values seen so far. """
+        return np.sqrt(self.sumsq / self.count)
+
+    @property
+    def peak(self):
+        """ Largest absolute value seen so far. """
+        return max(abs(self.min), abs(self.max))
+
+
+def iterBlocks(source, blocksize=48000):
+    """
+        Yield consecutive blocks of BLOCKSIZE samples from
+        SOURCE, which can be a path to a WAV file (read as
+        a memory map), a memmap or an array. Blocks are
+        sliced along the first axis, i.e., samples for
+        WAV data (samples, channels).
+    """
+    if isinstance(source, str):
+        fs, source = wavfile.read(source, mmap=True)
+    for start in range(0, len(source), blocksize):
+        yield source[start:start+blocksize]
+
+
+def streamRMS(blocks):
+    """
+        Calculate the root mean square of a signal delivered
+        as an iterable of BLOCKS. Equivalent to ts.rms.
+    """
+    stats = RunningStats()
+    for block in blocks:
+        stats.update(block)
+    return stats.rms
+
+
+def streamNormalize(source, blocksize=48000):
+    """
+        Normalize SOURCE between +1 and -1 block by block,
+        yielding float64 blocks. Equivalent to ts.doNormalize.
+        Needs two passes (min/max, then scaling), so SOURCE must
+        be a WAV path, memmap or array rather than a generator.
+    """
+    stats = RunningStats()
+    for block in iterBlocks(source, blocksize):
+        stats.update(block)
+    denom = stats.max - stats.min
+    for block in iterBlocks(source, blocksize):
+        # Same operation order as doNormalize
+        block = np.asarray(block, dtype=np.float64) - stats.min
+        block = block / denom
+        block = block * 2
+        yield block - 1
+
+
+def streamSpecLvl(blocks, upr, lwr):
+    """
+        Calculate the spectral density level of a noise
+        delivered as an iterable of BLOCKS. Equivalent to
+        ts.specLvl.
+    """
+    OAL = ts.mag2db(streamRMS(blocks))
+    BW = upr - lwr
+    SPLnb = OAL - 10*np.log10(BW/1) # same formula as ts.specLvl
+    return SPLnb
@@ -0,0 +1,215 @@
+"""
+    Append-only binary trial log. Each trial is one fixed-size
+    record (a NumPy structured array row with a CRC-32), written
+    after a header that describes the fields and the session.
+    Records are filled into a preallocated buffer and written
+    every FLUSHEVERY trials, followed by an fsync if FSYNC is
+    set, so a crash loses at most the unflushed trials. A record
+    torn by a crash fails its CRC and is dropped by the reader.
+
+    The session summary (e.g., the SNR50) is saved in a small
+    JSON file next to the log when it is closed. Exporting to
+    CSV or Excel happens after the session, from the log.
+
+    EXAMPLE:
+        import triallog
+        log = triallog.TrialLog(fileName + '.trials', triallog.FIELDS,
+            info=expInfo)
+        sched.submit(log.append, expInfo['Subject'], ...) # off the trial path
+        log.close(summary={'snr50': snr50})
+        triallog.exportCSV(fileName + '.trials', fileName + '.csv')
+
+    Created: Oct. 17, 2026
+"""
+
+import json
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+MAGIC = b'SNR50LOG'
+VERSION = 1
+
+# Record fields of the SNR50 scripts, in the order of their CSV files
+FIELDS = [('subject', 'U64'), ('condition', 'U64'), ('step_size', 'f8'),
+    ('num_correct', 'i4'), ('response', 'i4'), ('slm_output', 'f8'),
+    ('slm_cf', 'f8'), ('raw_level', 'f8'), ('final_level', 'f8')]
+
+
+def _recordType(fields):
+    return np.dtype([(name, '<' + fmt if fmt[0] in 'fiu' else fmt)
+        for name, fmt in fields] + [('crc', '<u4')])
+
+
+def _summaryPath(path):
+    return path + '.summary.json'
+
+
+class TrialLog:
+    """
+        Writer for one session's log.
+
+            PATH: log file. It must not exist yet.
+            FIELDS: list of (name, NumPy type) pairs, e.g.,
+                triallog.FIELDS
+            INFO: JSON-serializable session information (e.g.,
+                expInfo), saved in the header
+            FLUSHEVERY: number of trials buffered before they are
+                written (1 writes every trial)
+            FSYNC: force every write to disk with os.fsync
+            CAPACITY: preallocated buffer size in records
+    """
+    def __init__(self, path, fields, info=None, flushEvery=1, fsync=True,
+            capacity=64):
+        self.path = path
+        self.fields = [(name, fmt) for name, fmt in fields]
+        self.flushEvery = max(1, min(flushEvery, capacity))
+        self.fsync = fsync
+        self._type = _recordType(self.fields)
+        self._buffer = np.zeros(capacity, dtype=self._type)
+        self._count = 0 # records in the buffer
+        self._lock = threading.Lock()
+        self.written = 0 # records written to the file
+        header = json.dumps({'fields': self.fields,
+            'info': info or {}}, default=str).encode('utf-8')
+        self._file = open(path, 'xb')
+        self._file.write(MAGIC + struct.pack('<II', VERSION, len(header))
+            + header)
+        self._sync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, *values):
+        """
+            Add one trial; VALUES are in the order of FIELDS. The
+            record is written once FLUSHEVERY trials are
+            buffered. Safe to call from a writer thread (see
+            trialsched.TrialScheduler.submit).
+        """
+        with self._lock:
+            record = self._buffer[self._count:self._count + 1]
+            record[0] = tuple(values) + (0,)
+            record['crc'] = zlib.crc32(record.tobytes()[:-4])
+            self._count += 1
+            if self._count >= self.flushEvery:
+                self._write()
+
+    def _write(self):
+        if self._count:
+            self._file.write(self._buffer[:self._count].tobytes())
+            self.written += self._count
+            self._count = 0
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def flush(self):
+        """ Write any buffered trials now. """
+        with self._lock:
+            self._write()
+
+    def close(self, summary=None):
+        """
+            Write any buffered trials and close the log. SUMMARY
+            (a JSON-serializable dict) is saved next to the log.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._write()
+                os.fsync(self._file.fileno())
+                self._file.close()
+        if summary is not None:
+            path = _summaryPath(self.path)
+            tmp = path + '.%d.tmp' % os.getpid()
+            with open(tmp, 'w') as f:
+                json.dump(summary, f, indent=1)
+            os.replace(tmp, path) # atomic
+
+
+def readLog(path):
+    """
+        Read a log, including one left behind by a crash. Returns
+        (INFO, RECORDS, SUMMARY, DROPPED): the session information,
+        a structured array of the intact records, the summary
+        (None if the session did not close normally) and the
+        number of records dropped for a failed CRC or a torn end.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw[:len(MAGIC)] != MAGIC:
+        raise ValueError('%s is not a trial log' % path)
+    version, size = struct.unpack_from('<II', raw, len(MAGIC))
+    if version != VERSION:
+        raise ValueError('%s has log version %d, not %d'
+            % (path, version, VERSION))
+    start = len(MAGIC) + 8
+    header = json.loads(raw[start:start + size].decode('utf-8'))
+    recordType = _recordType(header['fields'])
+    body = raw[start + size:]
+    count = len(body) // recordType.itemsize
+    records = np.frombuffer(body, dtype=recordType, count=count)
+    good = np.array([zlib.crc32(rec.tobytes()[:-4]) == rec['crc']
+        for rec in records], dtype=bool)
+    torn = len(body) % recordType.itemsize != 0
+    summary = None
+    if os.path.exists(_summaryPath(path)):
+        with open(_summaryPath(path)) as f:
+            summary = json.load(f)
+    names = [name for name, fmt in header['fields']]
+    return (header['info'], records[good][names], summary,
+        int(np.sum(~good)) + torn)
+
+
+def _format(value):
+    # Same text as the scripts' %s/%i/%f formatting
+    if isinstance(value, (float, np.floating)):
+        return '%f' % value
+    return str(value)
+
+
+def exportCSV(path, csvpath):
+    """
+        Export the trials of the log PATH to CSVPATH, one row per
+        trial, with the same columns and number format as the
+        scripts' CSV files. If the session closed normally, its
+        summary is exported to CSVPATH with _summary before .csv.
+    """
+    info, records, summary, dropped = readLog(path)
+    names = records.dtype.names
+    with open(csvpath, 'w') as f:
+        f.write(','.join(names) + '\n')
+        for rec in records.tolist():
+            f.write(','.join(_format(x) for x in rec) + '\n')
+    if summary is not None:
+        with open(os.path.splitext(csvpath)[0] + '_summary.csv', 'w') as f:
+            f.write(','.join(summary) + '\n')
+            f.write(','.join(_format(x) for x in summary.values()) + '\n')
+    return dropped
+
+
+def exportExcel(path, xlsxpath):
+    """
+        Export the log PATH to XLSXPATH, with the trials, the
+        summary and the session information on separate sheets.
+        Needs pandas and openpyxl.
+    """
+    import pandas as pd
+    info, records, summary, dropped = readLog(path)
+    with pd.ExcelWriter(xlsxpath) as writer:
+        pd.DataFrame(records).to_excel(writer, sheet_name='trials',
+            index=False)
+        if summary is not None:
+            pd.DataFrame([summary]).to_excel(writer, sheet_name='summary',
+                index=False)
+        pd.DataFrame([info]).to_excel(writer, sheet_name='info', index=False)
+    return dropped
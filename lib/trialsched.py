@@ -0,0 +1,141 @@
+"""
+    Event-loop (asyncio) trial scheduler. A trial is written as a
+    coroutine: waits are awaited instead of blocking in
+    core.wait, so slow work (writing data, paging in the next
+    stimulus) runs in background threads while the participant
+    listens or responds, and every interval is timed from a fixed
+    reference (e.g., the response) rather than appended after
+    whatever work happened to precede it. Inter-trial timing then
+    no longer drifts with disk or CPU load.
+
+    The display and keyboard are only touched from the event loop
+    (the main thread), as psychopy requires.
+
+    EXAMPLE:
+        import trialsched
+        sched = trialsched.TrialScheduler(iti=1.0, gap=0.01)
+
+        async def runTrials():
+            for thisIncrement in staircase:
+                ...
+                await sched.sleep(sigdur)
+                keys = await sched.waitKeys(event.getKeys)
+                tResp = sched.now()
+                sched.submit(dataFile.write, line)
+                await sched.sleepUntil(tResp + sched.iti)
+
+        sched.run(runTrials())
+
+    Created: Oct. 17, 2026
+"""
+
+import asyncio
+import concurrent.futures
+import time
+
+
+class TrialScheduler:
+    """
+        Timing and background work for one session.
+
+            ITI: inter-trial interval in seconds, from the
+                response to the start of the next trial
+            GAP: silent interval in seconds between the end of
+                the stimulus and the response prompt
+            POLL: keyboard polling interval in seconds
+            SPIN: the last part of each wait, in seconds, that is
+                spent polling the clock instead of sleeping, to
+                avoid oversleeping (as core.wait does). It must
+                exceed the resolution of the system timer, about
+                15.6 ms on Windows; waits shorter than SPIN (e.g.,
+                GAP) are polled throughout.
+    """
+    def __init__(self, iti=1.0, gap=0.01, poll=0.002, spin=0.02):
+        self.iti = iti
+        self.gap = gap
+        self.poll = poll
+        self.spin = spin
+        # One writer thread, so data are written in order
+        self._writer = concurrent.futures.ThreadPoolExecutor(1)
+        self._workers = concurrent.futures.ThreadPoolExecutor(2)
+        self._pending = []
+
+    @staticmethod
+    def now():
+        """ Current time in seconds (time.perf_counter). """
+        return time.perf_counter()
+
+    async def sleepUntil(self, deadline):
+        """
+            Return at DEADLINE (see now), letting other tasks
+            run in the meantime. Returns at once if DEADLINE
+            has passed.
+        """
+        remaining = deadline - self.now()
+        if remaining > self.spin:
+            await asyncio.sleep(remaining - self.spin)
+        while self.now() < deadline:
+            await asyncio.sleep(0)
+
+    async def sleep(self, secs):
+        """ Wait SECS seconds, letting other tasks run. """
+        await self.sleepUntil(self.now() + secs)
+
+    async def waitKeys(self, getKeys, keyList=None, timeout=None):
+        """
+            Poll GETKEYS (e.g., psychopy event.getKeys, which
+            does not block) until a key is pressed, and return
+            the keys. Returns [] after TIMEOUT seconds.
+        """
+        start = self.now()
+        while True:
+            keys = getKeys(keyList=keyList) if keyList else getKeys()
+            if keys:
+                return keys
+            if timeout is not None and self.now() - start >= timeout:
+                return []
+            await asyncio.sleep(self.poll)
+
+    def submit(self, fn, *args):
+        """
+            Run FN(*ARGS) on the writer thread without waiting.
+            Calls run in the order they were submitted; use for
+            data writing. See flush.
+        """
+        future = self._writer.submit(fn, *args)
+        self._pending.append(future)
+        return future
+
+    def background(self, fn, *args):
+        """
+            Run FN(*ARGS) on a worker thread and return an
+            awaitable for its result; use for preparing the next
+            stimulus while this one is presented.
+        """
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._workers, fn, *args)
+
+    def flush(self):
+        """
+            Wait for everything passed to submit, and raise the
+            first error, if any.
+        """
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def run(self, coro):
+        """
+            Run the session coroutine CORO to completion, then
+            flush submitted work.
+        """
+        try:
+            return asyncio.run(coro)
+        finally:
+            self.flush()
+
+    def close(self):
+        """ Flush and stop the background threads. """
+        self.flush()
+        self._writer.shutdown()
+        self._workers.shutdown()
@@ -15,6 +15,8 @@
         2. If you press an unexpected key (i.e., anything other 
         than the numbers 1 - 5 from the numpad only), the response
         will be scored as incorrect and the routine will continue.
+        3. Run with --profile-imports to print how long the 
+        imports take before and after the parameter dialog.
 
         SUBJECT: The subject name or number, using any convention.
         CONDITION: The experimental condition.
@@ -32,38 +34,29 @@
 
     Written by: Travis M. Moore
     Created: May 18, 2022
-    Last edited: May 24, 2022
+    Last edited: Oct. 17, 2026
 """
 
-# Import psychopy tools
-import this
-from psychopy import core, visual, gui, data, event, prefs
-from psychopy.tools.filetools import fromFile, toFile
-import psychtoolbox as ptb
-prefs.hardware['audioLib'] = ['PTB']
-from psychopy import sound # Import "sound" AFTER assigning library!!
-
-# Import published modules
-import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
+# Import only what the parameter dialog needs. Heavier modules 
+# are imported once the dialog is closed; run with 
+# --profile-imports to print the import times (see lib/startup.py).
 import os
 import sys
-from scipy.io import wavfile
-import csv
 
-sys.path.append('.\\lib') # Point to custom library file
-import tmsignals as ts # Custom library
-import importlib 
-importlib.reload(ts) # Reload custom module on every run
-
-#################################
-#### FOLDER/INPUT MANAGEMENT ####
-#################################
 # Ensure that relative paths start from the same directory as this script
 _thisDir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(_thisDir)
+sys.path.append(_thisDir + os.sep + 'lib') # Point to custom library files
+import startup
 
+with startup.timed('psychopy (dialog)'):
+    from psychopy import core, gui, prefs
+    from psychopy.tools.filetools import fromFile, toFile
+startup.report('Imports before dialog')
+
+#################################
+#### FOLDER/INPUT MANAGEMENT ####
+#################################
 # Check for existing data folder
 if os.path.isdir(_thisDir + os.sep + 'data' + os.sep):
     print("Found data folder.")
@@ -81,7 +74,7 @@ try:
     expInfo = fromFile('lastParams.pickle')
 except:
     expInfo = {'Subject':'999', 'Condition':'Quiet', 'List Numbers':'1 2', 'Step Size':2.0, 'Starting Level': 65.0, 'Noise Level (dB)':70.0, 'Calibration':'n', 'SLM Output':80.0}
-expInfo['dateStr'] = data.getDateStr()
+expInfo['dateStr'] = startup.getDateStr()
 
 dlg = gui.DlgFromDict(expInfo, title='Adaptive SNR50 Task',
                       fixed=['dateStr'])
@@ -90,6 +83,17 @@ if dlg.OK:
 else:
     core.quit()
 
+# Import the rest now that the dialog is closed
+with startup.timed('numpy'):
+    import numpy as np
+with startup.timed('scipy.io.wavfile'):
+    from scipy.io import wavfile
+with startup.timed('tmsignals'):
+    import tmsignals as ts # Custom library
+with startup.timed('psychopy.sound (PTB)'):
+    prefs.hardware['audioLib'] = ['PTB']
+    from psychopy import sound # Import "sound" AFTER assigning library!!
+
 # Reference level for calibration and use with offset
 REF_LEVEL = -20.0
 
@@ -118,6 +122,23 @@ if expInfo['Calibration'] == 'y':
 #### END CALIBRATION ROUTINE ####
 #################################
 
+# Modules used only by the session (not by calibration)
+with startup.timed('staircase'):
+    import staircase as sc # StairHandler rules without psychopy.data
+with startup.timed('sentindex'):
+    import sentindex # IEEE-DF.csv without pandas
+with startup.timed('stimbank'):
+    import stimbank
+with startup.timed('trialsched'):
+    import trialsched
+with startup.timed('triallog'):
+    import triallog
+with startup.timed('ieeecorpus'):
+    import ieeecorpus
+with startup.timed('psychopy.visual/event'):
+    from psychopy import visual, event
+startup.report('Imports after dialog')
+
 SLM_OFFSET = expInfo['SLM Output'] - REF_LEVEL
 STARTING_LEVEL = expInfo['Starting Level'] - SLM_OFFSET
 print("\n")
@@ -134,10 +155,10 @@ print("=")
 print("STARTING LEVEL: " + str(STARTING_LEVEL))
 print("\n")
 
-# make a text file to save data
+# make a crash-safe trial log (exported to CSV at the end)
 fileName = _thisDir + os.sep + 'data' + os.sep + '%s_%s_%s' % (expInfo['Subject'], expInfo['Condition'], expInfo['dateStr'])
-dataFile = open(fileName+'.csv', 'w')
-dataFile.write('subject,condition,step_size,num_correct,response,slm_output,slm_cf,raw_level,final_level\n')
+log = triallog.TrialLog(fileName + '.trials', triallog.FIELDS,
+    info=expInfo)
 
 ##########################
 #### STIMULI/PARADIGM ####
@@ -150,37 +171,47 @@ dataFile.write('subject,condition,step_size,num_correct,response,slm_output,slm_
 #sentences = list(data_csv)
 
 # Get lists of written sentences
-df = pd.read_csv('.\\sentences\\IEEE-DF.csv')
+# (cached, pre-tokenized index; see lib/sentindex.py)
+sentIndex = sentindex.SentenceIndex.load('.\\sentences\\IEEE-DF.csv')
 lists = expInfo['List Numbers'].split()
 lists = [int(x) for x in lists]
-sentences = df.loc[df['list_num'].isin(lists), 'ieee_text']
+rows = sentIndex.select(lists) # in CSV order
+sentences = [sentIndex.texts[x] for x in rows]
 print(sentences)
 
 # Get audio files
-# NOTE: files must be renames as increasing
+# Use the precompiled corpus if it has been built 
+# (python lib\\ieeecorpus.py); otherwise read the WAV files.
+# NOTE: files must be renamed as increasing
 # integer values (e.g., 1, 2, 3...)
-fileList = os.listdir('.\\audio\\IEEE')
-x = [x[:-4] for x in fileList] # strip off '.wav'
-fileList = sorted(x, key = int) # sort strings as int
-fileList = [x+'.wav' for x in fileList] # add '.wav' back
-sentence_nums = df.loc[df['list_num'].isin(lists), 'sentence_num']
-sentence_nums = np.array(sentence_nums)
-#print(sentence_nums)
-fileList = np.array(fileList)
-fileList = fileList[sentence_nums]
+corpus = None
+if ieeecorpus.exists('corpus', '.\\sentences\\IEEE-DF.csv'):
+    corpus = ieeecorpus.IEEECorpus('corpus')
+    fileList = corpus.keys(lists)
+    # Audio and text must be the same sentences, in the same order
+    if fileList != list(zip(sentIndex.listNums[rows].tolist(),
+            sentIndex.sentenceNums[rows].tolist())):
+        corpus = None
+if corpus is None:
+    if ieeecorpus.exists('corpus'):
+        print('The corpus does not match IEEE-DF.csv; reading the WAV '
+            'files instead. Rebuild it with python lib\\ieeecorpus.py')
+    fileList = ieeecorpus.sortedFiles('.\\audio\\IEEE')
+    sentence_nums = sentIndex.sentenceNums[rows]
+    fileList = [fileList[x] for x in sentence_nums]
 #print(fileList)
 
-# Create staircase handler
-staircase = data.StairHandler(startVal = STARTING_LEVEL,
-                              stepType = 'lin',
-                              stepSizes=[expInfo['Step Size']],
-                              nup=1,
-                              nDown=1,
-                              nTrials=2,
-                              nReversals=3,
-                              applyInitialRule=True,
-                              minVal=-100,
-                              maxVal=0)
+# Create staircase handler (same rules as psychopy StairHandler)
+staircase = sc.Staircase(startVal = STARTING_LEVEL,
+                         stepType = 'lin',
+                         stepSizes=[expInfo['Step Size']],
+                         nUp=1,
+                         nDown=1,
+                         nTrials=2,
+                         nReversals=3,
+                         applyInitialRule=True,
+                         minVal=-100,
+                         maxVal=0)
 
 # create window and text objects
 win = visual.Window([800,600], screen=0, monitor='testMonitor', 
@@ -203,129 +234,160 @@ win.flip()
 instr_text.draw()
 win.flip() # to show newly-drawn stimuli
 
+# Preload, normalize and measure every sentence of the selected 
+# lists while the instructions are on screen, so that each trial 
+# only indexes into memory and applies a gain
+with startup.timed('preload %d sentences' % len(fileList)):
+    if corpus is not None: # memory-mapped, nothing to read
+        bank = corpus.bank(lists)
+    else:
+        bank = stimbank.StimulusBank.fromFiles(
+            ['audio\\IEEE\\' + x for x in fileList])
+startup.report('Stimulus preload')
+
 # Pause until keypress
 event.waitKeys()
 
-# Initialize variables
-thisResp = None
-
 #########################
 #### BEGIN STAIRCASE ####
 #########################
+# Trials run as a coroutine on an asyncio event loop (see 
+# lib/trialsched.py): data are written and the next sentence is 
+# paged in on background threads, and the inter-trial interval 
+# is timed from the response, so it does not drift with disk or 
+# CPU load.
+sched = trialsched.TrialScheduler(iti=1.0, gap=0.01)
+
 # Present stimuli using staircase procedure
-counter = -1
-for thisIncrement in staircase:
-    print("Raw Level: %f " % thisIncrement)
-    print("Corrected Level: " + str(thisIncrement+SLM_OFFSET) + " dB")
-
-    counter += 1 # for cycling through list of audio file names
-
-    # Initialize stimulus
-    try: # Import stimulus from file
-        [fs, myTarget] = wavfile.read('audio\\IEEE\\' + fileList[counter])
-    except: # No stimuli left in list
-        dataFile.close()
-        staircase.saveAsPickle(fileName)
-        feedback1 = visual.TextStim(
-            win, pos=[0,+3],
-            text = 'You ran out of lists! The data collected so far have been saved, ' +
-                'but you will have to calculate SNR50 manually.')
-
-        feedback1.draw()
+async def runStaircase():
+    # Initialize variables
+    thisResp = None
+    counter = -1
+    for thisIncrement in staircase:
+        print("Raw Level: %f " % thisIncrement)
+        print("Corrected Level: " + str(thisIncrement+SLM_OFFSET) + " dB")
+
+        counter += 1 # for cycling through list of audio file names
+
+        # Initialize stimulus from the preloaded bank
+        if counter >= len(bank): # No stimuli left in list
+            sched.flush()
+            log.close()
+            triallog.exportCSV(fileName + '.trials', fileName + '.csv')
+            staircase.saveAsPickle(fileName)
+            feedback1 = visual.TextStim(
+                win, pos=[0,+3],
+                text = 'You ran out of lists! The data collected so far have been saved, ' +
+                    'but you will have to calculate SNR50 manually.')
+
+            feedback1.draw()
+            win.flip()
+            event.waitKeys() # wait for participant to respond
+
+            win.close()
+            core.quit()
+        fs = bank.fs
+
+        """
+        # Present calibration stimulus for testing
+        [fs, calStim] = wavfile.read('calibration\\IEEE_cal.wav')
+        myTarget = calStim[:int(len(calStim)/2)] # truncate
+        # Normalize between +1/-1
+        myTarget = ts.doNormalize(myTarget,48000)
+        """
+
+        # Set target level (taken from thisIncrement on each loop iteration).
+        # The bank is already normalized between 1 and -1 and its RMS 
+        # and peak are stored, so this is one multiply (same result as 
+        # ts.setRMS(myTarget,thisIncrement,eq='n')), and clipping is 
+        # known before scaling.
+        if bank.clips(counter, thisIncrement):
+            print('Warning: stimulus will clip at %.1f dB (max %.1f dB)!' 
+                % (thisIncrement, bank.maxLevel(counter)))
+        myTarget = bank.atLevel(counter, thisIncrement)
+        #plt.plot(myTarget)
+        #plt.ylim([-1,1])
+        #plt.show()
+        #plt.plot(myTarget)
+        #plt.show()
+
+        ###################################
+        ###### STIMULUS PRESENTATION ######
+        ###################################
+        # Show stimulus text
+        # extract one sentence from list as string
+        theText = sentences[counter]
+        words = sentIndex.words[rows[counter]] # pre-tokenized
+        text_stim.setText('Wait...\n\n' + theText)
+        text_stim.setHeight(25)
+        text_stim.draw()
         win.flip()
-        event.waitKeys() # wait for participant to respond
-
-        win.close()
-        core.quit()
-    # Normalization between 1 and -1
-    myTarget = ts.doNormalize(myTarget,48000)
-    #plt.plot(myTarget)
-    #plt.show()
 
-    """
-    # Present calibration stimulus for testing
-    [fs, calStim] = wavfile.read('calibration\\IEEE_cal.wav')
-    myTarget = calStim[:int(len(calStim)/2)] # truncate
-    # Normalize between +1/-1
-    myTarget = ts.doNormalize(myTarget,48000)
-    """
-
-    # Set target level (taken from thisIncrement on each loop iteration)
-    myTarget = ts.setRMS(myTarget,thisIncrement,eq='n')
-    #plt.plot(myTarget)
-    #plt.ylim([-1,1])
-    #plt.show()
-    #plt.plot(myTarget)
-    #plt.show()
-
-    ###################################
-    ###### STIMULUS PRESENTATION ######
-    ###################################
-    # Show stimulus text
-    # extract one sentence from list as string
-    theText = ''.join(sentences.iloc[counter])
-    words = theText.split()
-    text_stim.setText('Wait...\n\n' + theText)
-    text_stim.setHeight(25)
-    text_stim.draw()
-    win.flip()
-
-    # Play stimulus
-    sigdur = len(myTarget) / fs
-    probe = sound.Sound(value=myTarget.T,
-        secs=sigdur, stereo=-1, volume=1.0, loops=0, 
-        sampleRate=fs, blockSize=4800, preBuffer=-1, 
-        hamming=False, startTime=0, stopTime=-1, 
-        autoLog=True)
-    probe.play()
-    core.wait(probe.secs+0.001)
+        # Play stimulus
+        sigdur = len(myTarget) / fs
+        probe = sound.Sound(value=myTarget.T,
+            secs=sigdur, stereo=-1, volume=1.0, loops=0, 
+            sampleRate=fs, blockSize=4800, preBuffer=-1, 
+            hamming=False, startTime=0, stopTime=-1, 
+            autoLog=True)
+        probe.play()
+        # Page in the next sentence while this one plays
+        nextStim = sched.background(bank.prefetch, counter+1)
+        await sched.sleep(probe.secs+0.001)
     
-    # Clear the window
-    text_stim.setText(" ")
-    text_stim.draw()
-    win.flip()
+        # Clear the window
+        text_stim.setText(" ")
+        text_stim.draw()
+        win.flip()
 
-    # Post-observation wait period
-    core.wait(0.01)
+        # Post-observation wait period
+        await sched.sleep(sched.gap)
     
-    # Prompt the user to respond
-    text_stim.setText('Respond\n\n' + theText)
-    text_stim.setHeight(25)
-    text_stim.draw()
-    win.flip()
-
-    # Get response
-    thisResp=None
-    while thisResp==None:
-        allKeys=event.waitKeys()
-        for thisKey in allKeys:
-            if thisKey in ['num_1','num_2','num_3','num_4']: 
-                thisResp = -1
-                thisKey = int(thisKey[-1])
-            elif thisKey == 'num_5':
-                thisResp = 1
-                thisKey = int(thisKey[-1])
-            elif thisKey in ['q', 'escape']:
-                core.quit() # abort experiment
-            else:
-                thisKey = int(999)
-                thisResp = 999 # make this an int to avoid the program crashing
-        event.clearEvents() # clear other (e.g., mouse events: they clog the buffer)
-
-        # Assign pass/fail
-        if thisResp == -1: # Must use 1/-1 for psychopy logic
-            print("Fail")
-        elif thisResp == 1: # Must use 1/-1 for psychopy logic
-            print("Pass")
-        else: 
-            print("Invalid Response!")
-
-        # Update staircase handler and write data to file
-        staircase.addData(thisResp)
-        dataFile.write('%s,%s,%f,%i,%i,%f,%f,%f,%f\n' %  (expInfo['Subject'], 
-            expInfo['Condition'], expInfo['Step Size'], thisKey, thisResp, 
-            expInfo['SLM Output'], SLM_OFFSET, thisIncrement, thisIncrement+SLM_OFFSET))
-        core.wait(1)
+        # Prompt the user to respond
+        text_stim.setText('Respond\n\n' + theText)
+        text_stim.setHeight(25)
+        text_stim.draw()
+        win.flip()
+
+        # Get response
+        thisResp=None
+        event.clearEvents(eventType='keyboard') # as event.waitKeys does
+        while thisResp==None:
+            allKeys = await sched.waitKeys(event.getKeys)
+            tResp = sched.now()
+            for thisKey in allKeys:
+                if thisKey in ['num_1','num_2','num_3','num_4']: 
+                    thisResp = -1
+                    thisKey = int(thisKey[-1])
+                elif thisKey == 'num_5':
+                    thisResp = 1
+                    thisKey = int(thisKey[-1])
+                elif thisKey in ['q', 'escape']:
+                    core.quit() # abort experiment
+                else:
+                    thisKey = int(999)
+                    thisResp = 999 # make this an int to avoid the program crashing
+            event.clearEvents() # clear other (e.g., mouse events: they clog the buffer)
+
+            # Assign pass/fail
+            if thisResp == -1: # Must use 1/-1 for psychopy logic
+                print("Fail")
+            elif thisResp == 1: # Must use 1/-1 for psychopy logic
+                print("Pass")
+            else: 
+                print("Invalid Response!")
+
+            # Update staircase handler and write data to file 
+            # (on the writer thread, during the inter-trial interval)
+            staircase.addData(thisResp)
+            sched.submit(log.append, expInfo['Subject'], 
+                expInfo['Condition'], expInfo['Step Size'], thisKey, thisResp, 
+                expInfo['SLM Output'], SLM_OFFSET, thisIncrement, thisIncrement+SLM_OFFSET)
+            await nextStim
+            await sched.sleepUntil(tResp + sched.iti)
+
+sched.run(runStaircase())
+sched.close()
 #######################
 #### END STAIRCASE ####
 #######################
@@ -337,9 +399,11 @@ for thisIncrement in staircase:
 approxThreshold = np.average(staircase.reversalIntensities[-2:])
 approxThresholdCorrected = approxThreshold+SLM_OFFSET
 snr50 = (approxThreshold+SLM_OFFSET)-expInfo['Noise Level (dB)']
-dataFile.write('SNR50: ' + str(snr50) + ' dB')
-core.wait(0.5)
-dataFile.close()
+# The SNR50 goes in its own file (_summary.csv), keeping the 
+# trial CSV one row per trial
+log.close(summary={'speech_level': approxThresholdCorrected,
+    'noise_level': expInfo['Noise Level (dB)'], 'snr50': snr50})
+triallog.exportCSV(fileName + '.trials', fileName + '.csv')
 staircase.saveAsPickle(fileName)
 staircase.saveAsExcel(fileName + '.xlsx', sheetName='trials')
 